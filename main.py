@@ -36,6 +36,7 @@ import sys
 from datetime import datetime
 import json
 from PIL import Image, ImageTk
+from PIL.PngImagePlugin import PngInfo
 import shutil
 import psutil
 import pyperclip
@@ -44,6 +45,27 @@ from tkinterweb import HtmlFrame
 import markdown2
 import pygame
 import io
+import queue
+import struct
+import stat
+import select
+import ctypes
+import ctypes.util
+import math
+import urllib.parse
+import errno
+import re
+import mmap
+import bisect
+import hashlib
+import sqlite3
+import fnmatch
+import http.server
+from concurrent.futures import ThreadPoolExecutor
+import socket
+import tempfile
+from collections import namedtuple, OrderedDict, deque
+from array import array
 
 # Global path variables
 
@@ -55,6 +77,11 @@ THEME_FILE = HOME_DIR + ".controlpanel_theme"
 PLUGIN_DIR = HOME_DIR + ".controlpanel_plugins"
 SEARCH_HISTORY_FILE = HOME_DIR + ".controlpanel_search_history"
 FAVORITES_FILE = HOME_DIR + ".controlpanel_favorites.json"
+ALERTS_FILE = HOME_DIR + ".controlpanel_alerts.json"
+EXPORT_FILE = HOME_DIR + ".controlpanel_export"
+INDEX_FILE = HOME_DIR + ".controlpanel_index.json"
+INDEX_DB = HOME_DIR + ".controlpanel_index.db"
+THUMB_DIR = HOME_DIR + ".controlpanel_thumbs/"
 CURRENT_BG = "#FFFFFF"
 os.makedirs(PLUGIN_DIR, exist_ok=True)
 
@@ -68,13 +95,12 @@ class ToggleSwitch(tk.Canvas):
     
     def __init__(self, parent, width=60, height=30, bg_on="#4CAF50",\
                  bg_off="#888888",
-                 circle_color="#FFFFFF", command=None, initial=False, theme=True):
+                 circle_color="#FFFFFF", command=None, initial=False):
         
         super().__init__(parent, width=width, height=height, highlightthickness=0,
                          bg=CURRENT_BG)
 
         self.width = width
-        self.theme = theme
         self.height = int(height)
         self.bg_on = bg_on
         self.bg_off = bg_off
@@ -120,9 +146,6 @@ class ToggleSwitch(tk.Canvas):
         self.animate()
         if self.command:
             self.command(self.state)
-            
-        if self.theme:
-            self.after(500, os.execl(sys.executable, sys.executable, *sys.argv))
 
     def animate(self):
         target = self.width - self.radius if self.state else self.radius
@@ -210,6 +233,20 @@ def apply_theme():
                     background=CURRENT_BG,
                     foreground=fg)
 
+    style.configure("Treeview",
+                    background=CURRENT_BG,
+                    fieldbackground=CURRENT_BG,
+                    foreground=fg)
+
+    style.configure("Treeview.Heading",
+                    background=CURRENT_BG,
+                    foreground=fg)
+
+    style.configure("My.TButton",
+                    background=CURRENT_BG,
+                    foreground=fg,
+                    font=("Helvetica", 12))
+
 
 # -------------------------------
 #  Popups + Command Execution
@@ -293,6 +330,31 @@ def run_script_with_popup(name, path):
     except Exception as e:
         show_popup(f"{name} - Error", str(e))
 
+# Same as the two above, for things that fire on their own (scheduled tasks,
+# alert actions): call it off the Tk thread, so a slow "info" command can't
+# freeze the window; only the popup is handed to Tk
+def run_item_in_background(it):
+    try:
+        if it["type"] == "script":
+            subprocess.Popen(["/bin/bash", it["path"]])
+            output = "Script started."
+        elif it["kind"] == "info":
+            result = subprocess.run(
+                it["command"],
+                shell=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True
+            )
+            output = result.stdout.strip() or result.stderr.strip() or "(no output)"
+            output = truncate_output(output)
+        else:
+            subprocess.Popen(it["command"], shell=True)
+            output = "Command executed."
+        post_ui(show_popup, it["name"], output)
+    except Exception as e:
+        post_ui(show_popup, f"{it['name']} - Error", str(e))
+
 
 # -------------------------------
 #  GUI Setup
@@ -303,6 +365,37 @@ root.title("Command Center")
 root.geometry("1050x540")
 root.resizable(False, True)
 
+# -------------------------------
+#  UI Dispatch
+# -------------------------------
+
+# Tk is single-threaded. Worker threads never touch widgets themselves; they
+# post a callable here and the Tk thread runs it from an after() pump.
+ui_queue = queue.Queue()
+UI_PUMP_MS = 50
+UI_PUMP_BATCH = 100  # Max callbacks per pump so a flood can't freeze the window
+
+def post_ui(func, *args, **kwargs):
+    ui_queue.put((func, args, kwargs))
+
+def pump_ui_queue():
+    for _ in range(UI_PUMP_BATCH):
+        try:
+            func, args, kwargs = ui_queue.get_nowait()
+        except queue.Empty:
+            root.after(UI_PUMP_MS, pump_ui_queue)
+            return
+
+        try:
+            func(*args, **kwargs)
+        except Exception as e:
+            print(f"UI callback error: {e}")
+
+    # Batch was full, come straight back once Tk has had a chance to breathe
+    root.after(1, pump_ui_queue)
+
+pump_ui_queue()
+
 
 # Setup icons
 ICON_PATH = HOME_DIR + "icons/"
@@ -332,6 +425,18 @@ tab_names = ["Dashboard", "System", "Developer", "Plugins", "Tasks",
 
 dash_interval = tk.IntVar(value=5)
 
+# Plain copy of dash_interval that worker threads can read (Tk variables are main-thread only)
+REFRESH_INTERVAL = 5
+
+def on_interval_change(*_):
+    global REFRESH_INTERVAL
+    try:
+        REFRESH_INTERVAL = max(1, dash_interval.get())
+    except tk.TclError:
+        pass  # Spinbox is empty/mid-edit, keep the old value
+
+dash_interval.trace_add("write", on_interval_change)
+
 tabs = {}
 for name in tab_names:
     frame = tk.Frame(notebook, bg=CURRENT_BG)
@@ -357,15 +462,56 @@ def add_section(parent, title):
     sep.pack(fill="x", padx=10, pady=(0, 10))
     
 def build_tasks_panel():
-    global task_list_frame
+    global task_list_frame, task_tree, task_rows, task_order
 
     for child in tabs["Tasks"].winfo_children():
         child.destroy()
 
     task_list_frame = tk.Frame(tabs["Tasks"], bg=CURRENT_BG)
     task_list_frame.pack(fill="both", expand=True, padx=10, pady=10)
-    
-build_tasks_panel()
+
+    # Buttons act on whatever rows are selected
+    button_row = tk.Frame(task_list_frame, bg=CURRENT_BG)
+    button_row.pack(side="bottom", fill="x", pady=(5, 0))
+    ttk.Button(button_row, text="Kill Tree", command=lambda: kill_selected_trees()).pack(side="right")
+    ttk.Button(button_row, text="Kill", command=lambda: kill_selected_processes()).pack(side="right")
+    ttk.Checkbutton(button_row, text="Tree view", variable=task_tree_mode,
+                    command=lambda: set_task_view()).pack(side="left")
+
+    task_tree = ttk.Treeview(task_list_frame,
+                             columns=("pid", "cpu", "mem", "rss", "cpu_hist", "cpu_stats", "mem_hist", "name"),
+                             show="headings")
+    task_tree.heading("#0", text="NAME", anchor="w")
+    task_tree.heading("pid", text="PID", anchor="w")
+    task_tree.heading("cpu", text="CPU%", anchor="e")
+    task_tree.heading("mem", text="MEM%", anchor="e")
+    task_tree.heading("rss", text="RSS", anchor="e")
+    task_tree.heading("cpu_hist", text="CPU HISTORY", anchor="w")
+    task_tree.heading("cpu_stats", text="CPU MIN/AVG/MAX", anchor="w")
+    task_tree.heading("mem_hist", text="MEM HISTORY", anchor="w")
+    task_tree.heading("name", text="NAME", anchor="w")
+    task_tree.column("pid", width=70, anchor="w", stretch=False)
+    task_tree.column("cpu", width=60, anchor="e", stretch=False)
+    task_tree.column("mem", width=60, anchor="e", stretch=False)
+    task_tree.column("rss", width=80, anchor="e", stretch=False)
+    task_tree.column("cpu_hist", width=160, anchor="w", stretch=False)
+    task_tree.column("cpu_stats", width=140, anchor="w", stretch=False)
+    task_tree.column("mem_hist", width=160, anchor="w", stretch=False)
+    task_tree.column("name", anchor="w")
+
+    scrollbar = ttk.Scrollbar(task_list_frame, orient="vertical", command=task_tree.yview)
+    task_tree.configure(yscrollcommand=scrollbar.set)
+    scrollbar.pack(side="right", fill="y")
+    task_tree.pack(side="left", fill="both", expand=True)
+
+    task_tree.bind("<Button-3>", lambda e: show_task_menu(e))
+
+    # What is currently in the tree: iid (PID as str) -> (parent iid, values),
+    # plus the child order under each parent ("" is the top level)
+    task_rows = {}
+    task_order = {}
+
+task_tree_mode = tk.BooleanVar(value=False)
 
 panel = PanelContext(root, notebook, tabs)
 
@@ -393,9 +539,41 @@ def on_tab_change(event):
 
 notebook.bind("<<NotebookTabChanged>>", on_tab_change)
 
-def refresh_tab_backgrounds():
-    for frame in tabs.values():
-        frame.configure(bg=CURRENT_BG)
+# The theme switches in place. ttk widgets follow the styles apply_theme()
+# sets; plain Tk widgets keep the colours they were made with, so every one
+# still in the old background (and text colour) is moved to the new one.
+# Anything a widget walk can't reach (canvas drawings and the like)
+# registers a callable in theme_hooks.
+theme_hooks = []
+painted_bg = CURRENT_BG  # background the widgets on screen were built with
+
+def recolor_widgets(parent, old_bg, old_fg, fg):
+    for child in parent.winfo_children():
+        if not isinstance(child, ttk.Widget):
+            try:
+                bg = child.cget("background")
+            except tk.TclError:
+                bg = None
+            if bg == old_bg:
+                child.configure(background=CURRENT_BG)
+                try:
+                    if child.cget("foreground") == old_fg:
+                        child.configure(foreground=fg)
+                except tk.TclError:
+                    pass
+            elif bg == old_fg and isinstance(child, tk.Frame):
+                child.configure(background=fg)  # section separators
+        recolor_widgets(child, old_bg, old_fg, fg)
+
+def refresh_theme():
+    global painted_bg
+    if painted_bg != CURRENT_BG:
+        old_fg = "#FFFFFF" if painted_bg != "#FFFFFF" else "#000000"
+        fg = "#FFFFFF" if CURRENT_BG != "#FFFFFF" else "#000000"
+        recolor_widgets(root, painted_bg, old_fg, fg)
+        painted_bg = CURRENT_BG
+    for hook in theme_hooks:
+        hook()
         
         
 tasks_tab = tabs["Tasks"]
@@ -404,49 +582,356 @@ tasks_tab = tabs["Tasks"]
 #  Tasks Tab
 # -------------------------------
 
-def refresh_tasks_panel():
-    for child in task_list_frame.winfo_children():
-        child.destroy()
-        
-    fg = "#FFFFFF" if CURRENT_BG != "#FFFFFF" else "#000000"
+ProcSample = namedtuple("ProcSample", ["pid", "ppid", "name", "cpu", "mem", "rss",
+                                       "cpu_hist", "cpu_min", "cpu_avg", "cpu_max", "mem_hist"])
+
+# Samples kept per process for the history columns
+HISTORY_SAMPLES = 20
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+# Fixed-size ring of recent samples; memory never grows past `size` floats
+class MetricRing:
+    def __init__(self, size=HISTORY_SAMPLES):
+        self.values = array("f", [0.0]) * size
+        self.size = size
+        self.index = 0
+        self.count = 0
+
+    def push(self, value):
+        self.values[self.index] = value
+        self.index = (self.index + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+
+    # Oldest sample first
+    def ordered(self):
+        if self.count < self.size:
+            return self.values[:self.count]
+        return self.values[self.index:] + self.values[:self.index]
+
+    def stats(self):
+        window = self.ordered()
+        if not window:
+            return 0.0, 0.0, 0.0
+        return min(window), sum(window) / len(window), max(window)
+
+def sparkline(values, floor=1.0):
+    # Scale to the window's own peak, but never below `floor` so idle noise stays flat
+    peak = max(max(values, default=0.0), floor)
+    top = len(SPARK_CHARS) - 1
+    return "".join(SPARK_CHARS[min(top, int(v / peak * top + 0.5))] for v in values)
+
+# Samples every process on a background thread. psutil.Process handles are
+# kept between ticks so cpu_percent() is measured against the previous sample
+# instead of returning 0.0 for a brand-new object every time.
+class ProcessSampler:
+    def __init__(self):
+        self.procs = {}        # pid -> psutil.Process
+        self.history = {}      # pid -> (cpu MetricRing, mem MetricRing)
+        self.snapshot = ()     # tuple of ProcSample, replaced (never mutated) each tick
+        self.rss_by_name = {}  # process name -> total RSS, published with the snapshot
+        self.generation = 0    # bumped whenever a new snapshot is published
+
+    def sample(self):
+        alive = set(psutil.pids())
+
+        # Evict handles and history for processes that have exited
+        for pid in [pid for pid in self.procs if pid not in alive]:
+            del self.procs[pid]
+            self.history.pop(pid, None)
+
+        samples = []
+        for pid in alive:
+            proc = self.procs.get(pid)
+            if proc is None:
+                try:
+                    proc = psutil.Process(pid)
+                except psutil.Error:
+                    continue
+                self.procs[pid] = proc
 
-    header = tk.Label(task_list_frame, text="PID    CPU%    MEM%    NAME",
-                      bg=CURRENT_BG, fg=fg, font=("TkDefaultFont", 10, "bold"))
-    header.pack(anchor="w", pady=(0, 5))
+            try:
+                with proc.oneshot():
+                    ppid = proc.ppid()
+                    name = proc.name()
+                    cpu = proc.cpu_percent(None)
+                    mem = proc.memory_percent()
+                    rss = proc.memory_info().rss
+            except psutil.ZombieProcess:
+                continue
+            except psutil.NoSuchProcess:
+                self.procs.pop(pid, None)
+                self.history.pop(pid, None)
+                continue
+            except psutil.AccessDenied:
+                continue
+
+            rings = self.history.get(pid)
+            if rings is None:
+                rings = self.history[pid] = (MetricRing(), MetricRing())
+            cpu_ring, mem_ring = rings
+            cpu_ring.push(cpu)
+            mem_ring.push(mem)
+            cpu_min, cpu_avg, cpu_max = cpu_ring.stats()
+
+            samples.append(ProcSample(
+                pid, ppid, name, cpu, mem, rss,
+                sparkline(cpu_ring.ordered()), cpu_min, cpu_avg, cpu_max,
+                sparkline(mem_ring.ordered())
+            ))
+
+        rss_by_name = {}
+        for p in samples:
+            rss_by_name[p.name] = rss_by_name.get(p.name, 0) + p.rss
+
+        self.rss_by_name = rss_by_name
+        self.snapshot = tuple(samples)
+        self.generation += 1
+
+    def run(self):
+        # Prime the CPU counters so the first real snapshot isn't all zeros
+        self.sample()
+        time.sleep(1)
 
-    processes = []
-    for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
-        try:
-            processes.append(proc.info)
-        except Exception:
+        while True:
+            self.sample()
+            time.sleep(REFRESH_INTERVAL)
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+
+process_sampler = ProcessSampler()
+process_sampler.start()
+
+# Patch the tree so it matches `rows`, a list of (iid, parent iid, values) in
+# display order with parents before their children. The last value (the
+# process name) doubles as the tree label. Only rows that appeared,
+# disappeared, changed, were reparented or moved cost any Tk calls.
+def sync_task_rows(rows):
+    wanted = {}
+
+    # New, changed and reparented rows first, so the children of an exited
+    # process are moved out before it gets deleted
+    for iid, parent, values in rows:
+        wanted.setdefault(parent, []).append(iid)
+        old = task_rows.get(iid)
+        if old is None:
+            task_tree.insert(parent, "end", iid=iid, text=values[-1], values=values,
+                             open=(parent == ""))
+            task_order.setdefault(parent, []).append(iid)
+        else:
+            old_parent, old_values = old
+            if old_values != values:
+                task_tree.item(iid, text=values[-1], values=values)
+            if old_parent != parent:
+                task_tree.move(iid, parent, "end")
+                task_order[old_parent].remove(iid)
+                task_order.setdefault(parent, []).append(iid)
+        task_rows[iid] = (parent, values)
+
+    # Exited processes. Anything still under a gone row is gone too, so only
+    # the top-most ones need deleting.
+    gone = set(task_rows) - {iid for iid, _, _ in rows}
+    if gone:
+        task_tree.delete(*[iid for iid in gone if task_rows[iid][0] not in gone])
+        for iid in gone:
+            parent = task_rows.pop(iid)[0]
+            if parent not in gone:
+                task_order[parent].remove(iid)
+            task_order.pop(iid, None)
+
+    # Only move the rows that are out of place
+    for parent, children in wanted.items():
+        order = task_order[parent]
+        for index, iid in enumerate(children):
+            if order[index] != iid:
+                order.remove(iid)
+                order.insert(index, iid)
+                task_tree.move(iid, parent, index)
+
+def clear_task_rows():
+    task_tree.delete(*task_tree.get_children())
+    task_rows.clear()
+    task_order.clear()
+
+# ppid links -> children lists, keyed by PID. Processes whose parent isn't in
+# the snapshot (or is themselves) become roots under None.
+def process_children(snapshot):
+    pids = {p.pid for p in snapshot}
+    children = {}
+    for p in snapshot:
+        parent = p.ppid if p.ppid in pids and p.ppid != p.pid else None
+        children.setdefault(parent, []).append(p)
+    return children
+
+# PIDs of every process under (and including) each of `pids`
+def process_subtree(children, pids):
+    found = set()
+    stack = list(pids)
+    while stack:
+        pid = stack.pop()
+        if pid in found:
             continue
+        found.add(pid)
+        stack.extend(child.pid for child in children.get(pid, ()))
+    return found
 
-    processes.sort(key=lambda p: p['cpu_percent'], reverse=True)
+def task_values(p, cpu, mem, rss):
+    return (p.pid, f"{cpu:.1f}", f"{mem:.1f}", format_bytes(rss),
+            p.cpu_hist, f"{p.cpu_min:.1f} / {p.cpu_avg:.1f} / {p.cpu_max:.1f}",
+            p.mem_hist, p.name)
 
-    for info in processes:
-        pid = info['pid']
-        name = info['name']
-        cpu = info['cpu_percent']
-        mem = info['memory_percent']
+def format_bytes(n):
+    for unit in ["B", "K", "M", "G", "T"]:
+        if n < 1024 or unit == "T":
+            return f"{n:.0f}{unit}" if unit == "B" else f"{n:.1f}{unit}"
+        n /= 1024
 
-        row = tk.Frame(task_list_frame, bg=CURRENT_BG)
-        row.pack(fill="x", pady=1)
+task_generation = -1
+task_children = {}
 
-        label = tk.Label(row,
-                         text=f"{pid:<6} {cpu:>5.1f}%   {mem:>5.1f}%   {name}",
-                         bg=CURRENT_BG, fg=fg, anchor="w")
-        label.pack(side="left", fill="x", expand=True)
+def update_task_rows():
+    global task_generation, task_children
 
-        def kill_process(p=pid):
-            try:
-                psutil.Process(p).kill()
-                refresh_tasks_panel()
-            except Exception as e:
-                show_popup("Error", str(e))
+    # Nothing new from the sampler since the last render
+    if process_sampler.generation == task_generation:
+        return
+    task_generation = process_sampler.generation
 
-        ttk.Button(row, text="Kill", command=kill_process).pack(side="right")
+    snapshot = process_sampler.snapshot
+    task_children = process_children(snapshot)
 
-    tasks_tab.after(dash_interval.get() * 1000, refresh_tasks_panel)
+    if not task_tree_mode.get():
+        # PID as a tie-breaker keeps idle processes from shuffling around
+        processes = sorted(snapshot, key=lambda p: (-p.cpu, p.pid))
+        sync_task_rows([(str(p.pid), "", task_values(p, p.cpu, p.mem, p.rss))
+                        for p in processes])
+        return
+
+    # Parents before children. Iterative, process trees can be deeper than
+    # the recursion limit.
+    preorder = []
+    stack = list(task_children.get(None, ()))
+    while stack:
+        p = stack.pop()
+        preorder.append(p)
+        stack.extend(task_children.get(p.pid, ()))
+
+    # Subtree totals: walking the pre-order backwards visits children first
+    totals = {}
+    for p in reversed(preorder):
+        cpu, mem, rss = p.cpu, p.mem, p.rss
+        for child in task_children.get(p.pid, ()):
+            child_cpu, child_mem, child_rss = totals[child.pid]
+            cpu += child_cpu
+            mem += child_mem
+            rss += child_rss
+        totals[p.pid] = (cpu, mem, rss)
+
+    # Busiest subtree first among siblings
+    def by_load(procs):
+        return sorted(procs, key=lambda c: (totals[c.pid][0], -c.pid))
+
+    rows = []
+    stack = [(p, "") for p in by_load(task_children.get(None, ()))]
+    while stack:
+        p, parent = stack.pop()
+        rows.append((str(p.pid), parent, task_values(p, *totals[p.pid])))
+        stack.extend((child, str(p.pid)) for child in by_load(task_children.get(p.pid, ())))
+
+    sync_task_rows(rows)
+
+def set_task_view():
+    global task_generation
+
+    if task_tree_mode.get():
+        task_tree.configure(show="tree headings",
+                            displaycolumns=("pid", "cpu", "mem", "rss", "cpu_hist", "cpu_stats", "mem_hist"))
+    else:
+        task_tree.configure(show="headings", displaycolumns="#all")
+
+    # The layouts don't share a row structure, so start over from the current snapshot
+    clear_task_rows()
+    task_generation = -1
+    update_task_rows()
+
+# Re-sync with the given iids removed, keeping everything else as displayed
+def drop_task_rows(iids):
+    rows = []
+    stack = [(iid, "") for iid in reversed(task_order.get("", ()))]
+    while stack:
+        iid, parent = stack.pop()
+        if iid in iids:
+            continue
+        rows.append((iid, parent, task_rows[iid][1]))
+        stack.extend((child, iid) for child in reversed(task_order.get(iid, ())))
+    sync_task_rows(rows)
+
+def kill_selected_processes():
+    killed = set()
+    for iid in task_tree.selection():
+        try:
+            psutil.Process(int(iid)).kill()
+            killed.add(iid)
+        except Exception as e:
+            show_popup("Error", str(e))
+
+    # Drop them right away instead of waiting for the next sample
+    drop_task_rows(killed)
+
+def kill_selected_trees():
+    pids = process_subtree(task_children, [int(iid) for iid in task_tree.selection()])
+    pids.discard(os.getpid())  # Never take the panel down with it
+
+    procs = []
+    for pid in pids:
+        try:
+            procs.append(psutil.Process(pid))
+        except psutil.Error:
+            pass
+
+    # Freeze the whole subtree first so nothing can fork or respawn
+    # in between, then kill it in one pass
+    errors = []
+    for proc in procs:
+        try:
+            proc.suspend()
+        except psutil.Error:
+            pass
+    for proc in procs:
+        try:
+            proc.kill()
+        except psutil.NoSuchProcess:
+            pass
+        except psutil.Error as e:
+            errors.append(f"{proc.pid}: {e}")
+
+    if errors:
+        show_popup("Error", truncate_output("\n".join(errors)))
+
+    drop_task_rows({str(pid) for pid in pids})
+
+def show_task_menu(event):
+    iid = task_tree.identify_row(event.y)
+    if not iid:
+        return
+    if iid not in task_tree.selection():
+        task_tree.selection_set(iid)
+
+    menu = tk.Menu(root, tearoff=0,
+                   bg=CURRENT_BG,
+                   fg="#FFFFFF" if CURRENT_BG != "#FFFFFF" else "#000000")
+    menu.add_command(label="Kill", command=kill_selected_processes)
+    menu.add_command(label="Kill Tree", command=kill_selected_trees)
+
+    try:
+        menu.tk_popup(event.x_root, event.y_root)
+    finally:
+        menu.grab_release()
+
+def refresh_tasks_panel():
+    update_task_rows()
+    tasks_tab.after(REFRESH_INTERVAL * 1000, refresh_tasks_panel)
 
 build_tasks_panel()
 refresh_tasks_panel()
@@ -469,7 +954,7 @@ theme_toggle = ToggleSwitch(
     bg_off="#424040",
     circle_color="#FFFFFF",
     initial=(load_theme() == "dark"),
-    command=lambda s: (save_theme("dark" if s else "light"), apply_theme(), refresh_tab_backgrounds())
+    command=lambda s: (save_theme("dark" if s else "light"), apply_theme(), refresh_theme())
 )
 
 theme_toggle.pack(pady=10)
@@ -490,8 +975,7 @@ fuzzy_toggle = ToggleSwitch(
     bg_off="#555555",
     circle_color="#FFFFFF",
     initial=FUZZY_ENABLED,
-    command=toggle_fuzzy,
-    theme=False
+    command=toggle_fuzzy
 )
 fuzzy_toggle.pack(pady=10)
 
@@ -718,15 +1202,940 @@ preview_frame.pack(side="right", fill="both")
 
 def clear_preview():
     global preview_frame
+    # Stop playback now rather than on its next tick, which could cut off
+    # audio the new preview has already started
+    if VideoPlayer.active is not None:
+        VideoPlayer.active.stop()
     if preview_frame is not None:
         preview_frame.destroy()
         preview_frame = None
 
+# --- Thumbnails ---
+
+# Small PNGs under THUMB_DIR keyed by (path, size, mtime, box), so clicking
+# back and forth through a folder only decodes each file once. Images, the
+# first page of PDFs and the first frame of videos (the poster shown while
+# the player starts) all go through it. The oldest files go when the cache
+# passes THUMB_CACHE_BYTES. Safe to use from any thread; the preview workers
+# below are what fill it.
+
+PREVIEW_SIZE = (280, 280)
+THUMB_CACHE_BYTES = 64 * 1024 * 1024
+THUMB_META_KEYS = ("pages",)  # img.info entries kept as PNG text chunks
+
+class ThumbnailCache:
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.files = OrderedDict()  # file name -> bytes, least recently used first
+        self.total = 0
+
+        os.makedirs(directory, exist_ok=True)
+        found = []
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.name.endswith(".png"):
+                    st = entry.stat()
+                    found.append((st.st_mtime, entry.name, st.st_size))
+                elif entry.name.endswith(".tmp"):
+                    # Left behind by a write that never finished
+                    try:
+                        os.remove(entry.path)
+                    except OSError:
+                        pass
+        for _, name, size in sorted(found):
+            self.files[name] = size
+            self.total += size
+
+    def key(self, path, st, size):
+        raw = f"{path}\0{st.st_size}\0{st.st_mtime_ns}\0{size[0]}x{size[1]}"
+        return hashlib.sha1(raw.encode("utf-8", "surrogateescape")).hexdigest() + ".png"
+
+    def load(self, key):
+        with self.lock:
+            if key not in self.files:
+                return None
+            self.files.move_to_end(key)
+        file = self.directory + key
+        try:
+            img = Image.open(file)
+            img.load()
+            os.utime(file)  # keeps LRU order across restarts
+            return img
+        except OSError:
+            with self.lock:
+                self.total -= self.files.pop(key, 0)
+            return None
+
+    def store(self, key, img):
+        meta = PngInfo()
+        for k in THUMB_META_KEYS:
+            if k in img.info:
+                meta.add_text(k, str(img.info[k]))
+        file = self.directory + key
+        # Own temp name per write: two workers can make the same key at once,
+        # and each replace() must publish a whole PNG
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                img.save(f, "PNG", pnginfo=meta)
+            os.replace(tmp, file)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        size = os.path.getsize(file)
+
+        with self.lock:
+            self.total += size - self.files.pop(key, 0)
+            self.files[key] = size
+            while self.total > self.max_bytes and len(self.files) > 1:
+                old, old_size = self.files.popitem(last=False)
+                self.total -= old_size
+                try:
+                    os.remove(self.directory + old)
+                except OSError:
+                    pass
+
+    # Cached thumbnail, or a freshly made (and stored) one
+    def get(self, path, size=PREVIEW_SIZE):
+        st = os.stat(path)
+        key = self.key(path, st, size)
+        img = self.load(key)
+        if img is None:
+            img = make_thumbnail(path, size)
+            try:
+                self.store(key, img)
+            except OSError as e:
+                print(f"Thumbnail cache write failed: {e}")
+        return img
+
+
+# Decode only as much of an image as a `size` box needs. JPEG decodes
+# straight at 1/2, 1/4 or 1/8 scale through draft(); other formats are box
+# reduced by an integer factor first so the final resample stays cheap.
+# reduce() only takes the modes below; palette and bilevel images skip it
+# (thumbnail() resizes those nearest-neighbour anyway) and 16-bit greyscale
+# is widened to "I" first, since neither reduce() nor resize() accept it.
+REDUCE_MODES = ("L", "LA", "PA", "RGB", "RGBA", "CMYK", "I", "F")
+
+def decode_reduced(path, size):
+    img = Image.open(path)
+    img.draft("RGB", size)
+    if img.mode.startswith("I;"):
+        img = img.convert("I")
+    factor = min(img.width // size[0], img.height // size[1])
+    if factor >= 2 and img.mode in REDUCE_MODES:
+        img = img.reduce(factor)
+    return img
+
+# 32-bit int and float images (16-bit PNGs, scientific TIFFs) rarely use
+# 0-255, and convert() clips rather than scales, so stretch the range the
+# image actually uses onto 8-bit grey
+def stretch_to_8bit(img):
+    lo, hi = img.getextrema()
+    if hi <= lo:
+        return Image.new("L", img.size, 255 if hi > 0 else 0)
+    scale = 255.0 / (hi - lo)
+    return img.point(lambda v: v * scale - lo * scale).convert("L")
+
+# Decode a file down to a thumbnail PNG can store. A PDF's page count rides
+# along in img.info["pages"] (a string once it's been through the cache).
+def make_thumbnail(path, size):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".pdf":
+        img = pdf_documents.render((path, os.stat(path).st_mtime_ns), 0, size)
+    elif ext in VIDEO_EXTS:
+        cap = cv2.VideoCapture(path)
+        try:
+            ok, frame = cap.read()
+        finally:
+            cap.release()
+        if not ok:
+            raise ValueError("no frames could be read")
+        img = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    else:
+        img = decode_reduced(path, size)
+
+    img.thumbnail(size)
+    if img.mode in ("I", "F"):
+        img = stretch_to_8bit(img)
+    elif img.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+        img = img.convert("RGBA" if "A" in img.mode else "RGB")
+    return img
+
+thumbnail_cache = ThumbnailCache(THUMB_DIR, THUMB_CACHE_BYTES)
+
+# --- Preview pipeline ---
+
+# Everything slow about a preview (decoding, rendering, pretty-printing) runs
+# on PREVIEW_WORKERS threads and comes back as a PreviewResult, which
+# render_preview turns into widgets on Tk. Results are kept in a small LRU
+# keyed by (path, mtime). Each show_preview bumps preview_token, so jobs for
+# a file the user already clicked away from are skipped or dropped.
+# PDFs use the same workers and cache with their own paged view (below).
+# Audio, video, SVG, HTML and playlists still build their widgets directly.
+
+PREVIEW_WORKERS = 2
+PREVIEW_CACHE_SIZE = 32
+PREVIEW_TEXT_EXTS = [".txt", ".md", ".json", ".py", ".sh", ".log", ".cfg", ".ini", ".css", ".js"]
+
+# kind is "image" (data = PIL image), "text" (data = str, wrap = Text wrap
+# mode), "html" (data = markup), "error" or "none"
+PreviewResult = namedtuple("PreviewResult", ["kind", "data", "wrap"], defaults=[None, "word"])
+
+preview_pool = ThreadPoolExecutor(max_workers=PREVIEW_WORKERS, thread_name_prefix="preview")
+preview_cache = OrderedDict()  # (path, mtime_ns) -> PreviewResult, Tk thread only
+preview_token = 0
+
+def uses_preview_pipeline(ext):
+    return ext in PREVIEW_IMAGE_EXTS or ext in PREVIEW_TEXT_EXTS or ext == ".xml"
+
+def produce_preview(path, ext):
+    if ext in PREVIEW_IMAGE_EXTS:
+        try:
+            return PreviewResult("image", thumbnail_cache.get(path))
+        except Exception as e:
+            return PreviewResult("error", f"Image Preview error: {e}")
+
+    if ext == ".xml":
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read(5000)
+            try:
+                text = xml.dom.minidom.parseString(text).toprettyxml(indent="  ")
+            except:
+                pass
+            return PreviewResult("text", text, wrap="none")
+        except Exception as e:
+            return PreviewResult("error", f"XML Preview error: {e}")
+
+    if ext == ".md":
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return PreviewResult("html", markdown2.markdown(f.read()))
+        except Exception as e:
+            print(f"Markdown Preview error: {e}")
+
+    try:
+        with open(path, "r") as f:
+            text = f.read(2000)
+        if ext == ".json":
+            try:
+                text = json.dumps(json.loads(text), indent=2)
+            except:
+                pass
+        return PreviewResult("text", text)
+    except:
+        return PreviewResult("none")
+
+def preview_job(token, key, path, ext):
+    # Superseded while waiting for a worker
+    if token != preview_token:
+        return
+    post_ui(finish_preview, token, key, produce_preview(path, ext))
+
+def remember_preview(key, result):
+    preview_cache[key] = result
+    preview_cache.move_to_end(key)
+    while len(preview_cache) > PREVIEW_CACHE_SIZE:
+        preview_cache.popitem(last=False)
+
+def finish_preview(token, key, result):
+    remember_preview(key, result)
+    if token == preview_token and preview_frame is not None:
+        render_preview(result)
+
+def request_preview(path, ext):
+    try:
+        key = (path, os.stat(path).st_mtime_ns)
+    except OSError as e:
+        render_preview(PreviewResult("error", f"Preview error: {e}"))
+        return
+
+    if key in preview_cache:
+        preview_cache.move_to_end(key)
+        render_preview(preview_cache[key])
+        return
+
+    fg = "#FFFFFF" if CURRENT_BG != "#FFFFFF" else "#000000"
+    tk.Label(preview_frame, text="Loading…", bg=CURRENT_BG, fg=fg, name="loading").pack(pady=20)
+    preview_pool.submit(preview_job, preview_token, key, path, ext)
+
+def render_preview(result):
+    fg = "#FFFFFF" if CURRENT_BG != "#FFFFFF" else "#000000"
+    loading = preview_frame.children.get("loading")
+    if loading is not None:
+        loading.destroy()
+
+    if result.kind == "image":
+        tkimg = ImageTk.PhotoImage(result.data)
+        lbl = tk.Label(preview_frame, image=tkimg, bg=CURRENT_BG)
+        lbl.image = tkimg
+        lbl.pack(pady=10)
+    elif result.kind == "text":
+        txt = tk.Text(preview_frame, bg=CURRENT_BG, fg=fg, wrap=result.wrap)
+        txt.insert("1.0", result.data)
+        txt.configure(state="disabled")
+        txt.pack(fill="both", expand=True, padx=10, pady=10)
+    elif result.kind == "html":
+        html_view = HtmlFrame(preview_frame)
+        html_view.load_html(result.data)
+        html_view.pack(fill="both", expand=True, padx=10, pady=10)
+    elif result.kind == "error":
+        tk.Label(preview_frame, text=result.data, bg=CURRENT_BG, fg=fg,
+                 font=("TkDefaultFont", 12), wraplength=250).pack(pady=50)
+    else:
+        tk.Label(preview_frame, text="No preview available", bg=CURRENT_BG, fg=fg).pack(pady=20)
+
+# --- Paged PDF ---
+
+# Pages render straight at preview size through a PyMuPDF matrix. Open
+# documents stay in a small LRU (closed when they fall out) so flipping pages
+# never reopens the file, and the pages either side of the one on screen are
+# rendered ahead on the preview workers. Rendered pages share preview_cache,
+# keyed (path, mtime, page). MuPDF documents aren't safe to use from two
+# threads at once, so one lock covers them all.
+
+PDF_OPEN_DOCS = 4
+
+class PdfDocuments:
+    def __init__(self, limit):
+        self.limit = limit
+        self.docs = OrderedDict()  # (path, mtime_ns) -> pymupdf.Document
+        self.lock = threading.Lock()
+
+    def render(self, key, page_no, size=PREVIEW_SIZE):
+        with self.lock:
+            doc = self.docs.get(key)
+            if doc is None:
+                doc = pymupdf.open(key[0])
+                self.docs[key] = doc
+                while len(self.docs) > self.limit:
+                    self.docs.popitem(last=False)[1].close()
+            self.docs.move_to_end(key)
+
+            page = doc.load_page(page_no)
+            zoom = min(size[0] / page.rect.width, size[1] / page.rect.height)
+            pix = page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom), alpha=False)
+            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+            img.info["pages"] = len(doc)
+            return img
+
+pdf_documents = PdfDocuments(PDF_OPEN_DOCS)
+
+# Page 0 comes through the thumbnail cache, so reopening a PDF shows its
+# first page without parsing the document again
+def pdf_page_job(token, key, page_no, deliver):
+    if token != preview_token:
+        return
+    try:
+        if page_no == 0:
+            img = thumbnail_cache.get(key[0])
+        else:
+            img = pdf_documents.render(key, page_no)
+        result = PreviewResult("image", img)
+    except Exception as e:
+        result = PreviewResult("error", f"PDF Preview error: {e}")
+    post_ui(deliver, page_no, result)
+
+def show_pdf_preview(path):
+    fg = "#FFFFFF" if CURRENT_BG != "#FFFFFF" else "#000000"
+    try:
+        key = (path, os.stat(path).st_mtime_ns)
+    except OSError as e:
+        render_preview(PreviewResult("error", f"Preview error: {e}"))
+        return
+
+    img_lbl = tk.Label(preview_frame, text="Loading…", bg=CURRENT_BG, fg=fg, wraplength=250)
+    img_lbl.pack(pady=10)
+
+    nav = tk.Frame(preview_frame, bg=CURRENT_BG)
+    nav.pack(pady=5)
+    prev_btn = ttk.Button(nav, text="◀", width=3, command=lambda: go(state["page"] - 1))
+    prev_btn.pack(side="left")
+    page_lbl = tk.Label(nav, text="", bg=CURRENT_BG, fg=fg)
+    page_lbl.pack(side="left", padx=10)
+    next_btn = ttk.Button(nav, text="▶", width=3, command=lambda: go(state["page"] + 1))
+    next_btn.pack(side="left")
+
+    token = preview_token
+    state = {"page": 0, "pages": None}
+    in_flight = set()
+
+    def fetch(page_no):
+        if page_no in in_flight or key + (page_no,) in preview_cache:
+            return
+        in_flight.add(page_no)
+        preview_pool.submit(pdf_page_job, token, key, page_no, deliver)
+
+    def deliver(page_no, result):
+        in_flight.discard(page_no)
+        remember_preview(key + (page_no,), result)
+        if token == preview_token and page_no == state["page"] and img_lbl.winfo_exists():
+            display(result)
+
+    def display(result):
+        if result.kind != "image":
+            img_lbl.configure(image="", text=result.data)
+            return
+
+        tkimg = ImageTk.PhotoImage(result.data)
+        img_lbl.configure(image=tkimg, text="")
+        img_lbl.image = tkimg
+
+        page, pages = state["page"], int(result.data.info["pages"])
+        state["pages"] = pages
+        page_lbl.configure(text=f"Page {page + 1} of {pages}")
+        prev_btn.state(["!disabled" if page > 0 else "disabled"])
+        next_btn.state(["!disabled" if page < pages - 1 else "disabled"])
+
+        # Render the neighbours while this one is being read
+        for n in (page + 1, page - 1):
+            if 0 <= n < pages:
+                fetch(n)
+
+    def go(page_no):
+        pages = state["pages"]
+        if page_no < 0 or (pages is not None and page_no >= pages):
+            return
+        state["page"] = page_no
+
+        cached = preview_cache.get(key + (page_no,))
+        if cached is not None:
+            preview_cache.move_to_end(key + (page_no,))
+            display(cached)
+        else:
+            page_lbl.configure(text=f"Page {page_no + 1} of {pages or '?'}…")
+            fetch(page_no)
+
+    go(0)
+
+# --- Video playback ---
+
+# A decoder thread reads frames in order, shrinks them to the pane with
+# cv2.resize before any colour conversion, and keeps up to VIDEO_QUEUE_FRAMES
+# ready in a bounded queue. The Tk side shows whichever frame is due against
+# the pygame audio clock (or wall time when there's no audio), skips frames
+# that are already late, and only asks the decoder to seek once it has fallen
+# more than VIDEO_MAX_DRIFT behind.
+
+VIDEO_QUEUE_FRAMES = 8
+VIDEO_MAX_DRIFT = 1.0  # seconds
+
+class VideoDecoder:
+    END = object()  # queued when the stream runs out
+
+    def __init__(self, path, size=PREVIEW_SIZE):
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise IOError(f"Could not open {os.path.basename(path)}")
+
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        w = self.cap.get(cv2.CAP_PROP_FRAME_WIDTH) or size[0]
+        h = self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or size[1]
+        scale = min(size[0] / w, size[1] / h, 1.0)
+        self.size = (max(1, int(w * scale)), max(1, int(h * scale)))
+
+        self.frames = queue.Queue(maxsize=VIDEO_QUEUE_FRAMES)
+        self.stopped = threading.Event()
+        self.wake = threading.Event()
+        self.lock = threading.Lock()
+        self.seek_to = None
+
+        threading.Thread(target=self.run, daemon=True).start()
+
+    # Jump to `seconds`; frames already queued are thrown away
+    def seek(self, seconds):
+        with self.lock:
+            self.seek_to = max(0.0, seconds)
+        self.drain()
+        self.wake.set()
+
+    def stop(self):
+        self.stopped.set()
+        self.wake.set()
+        self.drain()
+
+    def drain(self):
+        try:
+            while True:
+                self.frames.get_nowait()
+        except queue.Empty:
+            pass
+
+    def put(self, item):
+        while not self.stopped.is_set():
+            try:
+                self.frames.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                if self.seek_to is not None:
+                    return
+
+    def run(self):
+        index = 0
+        try:
+            while not self.stopped.is_set():
+                with self.lock:
+                    seek, self.seek_to = self.seek_to, None
+                if seek is not None:
+                    index = int(seek * self.fps)
+                    self.cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+                    self.drain()
+
+                ok, frame = self.cap.read()
+                if not ok:
+                    # Park until the player loops (seeks) or goes away
+                    self.put(self.END)
+                    self.wake.wait()
+                    self.wake.clear()
+                    continue
+
+                frame = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+                self.put((index / self.fps, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
+                index += 1
+        finally:
+            self.cap.release()
+
+class VideoPlayer:
+    TICK_MS = 10
+    active = None  # the player on screen, stopped when the preview changes
+
+    def __init__(self, label, path, on_stop=None):
+        self.label = label
+        self.on_stop = on_stop
+        self.decoder = VideoDecoder(path)
+        self.audio = False
+        self.pending = None  # next frame, pulled from the queue but not due yet
+        self.started = time.monotonic()
+        self.stopped = False
+
+        # Only one video plays at a time; pygame's music channel is shared.
+        # Done before the caller starts this one's audio.
+        if VideoPlayer.active is not None:
+            VideoPlayer.active.stop()
+        VideoPlayer.active = self
+
+    def play(self, audio=False):
+        self.audio = audio
+        self.started = time.monotonic()
+        self.tick()
+
+    # Media time in seconds, None once the audio track has finished
+    def clock(self):
+        if self.audio:
+            pos = pygame.mixer.music.get_pos()
+            return pos / 1000.0 if pos >= 0 else None
+        return time.monotonic() - self.started
+
+    # Loop video and audio together
+    def restart(self):
+        self.pending = None
+        self.decoder.seek(0)
+        if self.audio:
+            try:
+                pygame.mixer.music.play()
+            except pygame.error:
+                self.audio = False
+        self.started = time.monotonic()
+
+    def tick(self):
+        if self.stopped:
+            return
+        if not self.label.winfo_exists():
+            self.stop()
+            return
+
+        now = self.clock()
+        if now is None:
+            self.restart()
+            self.label.after(self.TICK_MS, self.tick)
+            return
+
+        # Newest frame that's due; anything older than it is dropped
+        due = None
+        while True:
+            if self.pending is None:
+                try:
+                    self.pending = self.decoder.frames.get_nowait()
+                except queue.Empty:
+                    break
+            if self.pending is VideoDecoder.END:
+                if not self.audio:
+                    self.restart()
+                break
+            if self.pending[0] > now + 0.5 / self.decoder.fps:
+                break
+            due, self.pending = self.pending, None
+
+        if due is not None:
+            tkimg = ImageTk.PhotoImage(Image.fromarray(due[1]))
+            self.label.configure(image=tkimg)
+            self.label.image = tkimg
+
+        # Way off the clock (slow decode, or audio jumped): resync instead of
+        # decoding our way there
+        head = self.pending if self.pending is not VideoDecoder.END else None
+        shown = head or due
+        if shown is not None and abs(shown[0] - now) > VIDEO_MAX_DRIFT:
+            self.pending = None
+            self.decoder.seek(now)
+
+        self.label.after(self.TICK_MS, self.tick)
+
+    def stop(self):
+        if self.stopped:
+            return
+        self.stopped = True
+        if VideoPlayer.active is self:
+            VideoPlayer.active = None
+        self.decoder.stop()
+        if self.audio:
+            pygame.mixer.music.stop()
+        if self.on_stop:
+            self.on_stop()
+
+# Cached first frame, shown until the player has decoded one of its own
+def show_video_poster(label, path):
+    token = preview_token
+
+    def job():
+        if token != preview_token:
+            return
+        try:
+            img = thumbnail_cache.get(path)
+        except Exception as e:
+            print(f"Video poster error: {e}")
+            return
+        post_ui(show, img)
+
+    def show(img):
+        if token != preview_token or not label.winfo_exists() or getattr(label, "image", None):
+            return
+        tkimg = ImageTk.PhotoImage(img)
+        label.configure(image=tkimg)
+        label.image = tkimg
+
+    preview_pool.submit(job)
+
+# --- Large text viewer ---
+
+# For logs and other text too big to load: only the lines on screen are read
+# and decoded into the Text widget, with positional reads (os.pread) rather
+# than a mapping of the whole file, which a 32-bit Pi can't fit for multi-GB
+# logs and which SIGBUSes if the log is truncated under it. A background
+# thread builds a sparse line index (newlines before each TEXT_BLOCK-sized
+# block) for jump-to-line and line numbers; everything else, scrolling
+# included, works straight off byte offsets and doesn't wait for it. Follow
+# mode polls the size and indexes only the appended bytes.
+
+LARGE_TEXT_BYTES = 1024 * 1024  # bigger text files open in the viewer
+TEXT_BLOCK = 64 * 1024
+TEXT_WINDOW_LINES = 200         # lines decoded per render, more than any screen
+TEXT_MAX_LINE = 2000            # characters shown of very long lines
+TEXT_FOLLOW_MS = 500
+
+class LargeTextViewer(tk.Frame):
+    def __init__(self, parent, path, width=40):
+        # Open first so a failure leaves no half-built widget behind
+        self.file = open(path, "rb")
+        super().__init__(parent, bg=CURRENT_BG)
+        fg = "#FFFFFF" if CURRENT_BG != "#FFFFFF" else "#000000"
+
+        # The lock guards size, block_lines, index_generation and the file
+        # itself; the index thread and the UI both go through it
+        self.lock = threading.Lock()
+        self.size = 0
+        self.top = 0                      # byte offset of the first line shown
+        self.block_lines = array("Q", [0])  # newlines before each block start
+        self.index_generation = 0         # bumped when the index starts over
+        self.indexing = False
+        self.closed = False
+        self.follow = tk.BooleanVar(value=False)
+        self.update_size()
+
+        # Controls
+        bar = tk.Frame(self, bg=CURRENT_BG)
+        bar.pack(fill="x")
+        self.line_var = tk.StringVar()
+        line_entry = ttk.Entry(bar, textvariable=self.line_var, width=8)
+        line_entry.pack(side="left", padx=(0, 5))
+        line_entry.bind("<Return>", lambda e: self.goto_line_entry())
+        ttk.Button(bar, text="Go", width=3, command=self.goto_line_entry).pack(side="left")
+        ttk.Button(bar, text="End", width=4, command=self.goto_end).pack(side="left", padx=5)
+        ttk.Checkbutton(bar, text="Follow", variable=self.follow,
+                        command=self.toggle_follow).pack(side="left")
+        self.status = tk.Label(self, text="", bg=CURRENT_BG, fg=fg, anchor="w")
+        self.status.pack(fill="x")
+
+        body = tk.Frame(self, bg=CURRENT_BG)
+        body.pack(fill="both", expand=True)
+        self.text = tk.Text(body, bg=CURRENT_BG, fg=fg, wrap="none", width=width)
+        yscroll = ttk.Scrollbar(body, orient="vertical", command=self.yview)
+        xscroll = ttk.Scrollbar(self, orient="horizontal", command=self.text.xview)
+        self.text.configure(xscrollcommand=xscroll.set)
+        self.yscroll = yscroll
+        yscroll.pack(side="right", fill="y")
+        self.text.pack(side="left", fill="both", expand=True)
+        xscroll.pack(fill="x")
+
+        # The Text only ever holds one window of lines, so scrolling is ours
+        self.text.bind("<MouseWheel>", lambda e: self.scroll(-3 if e.delta > 0 else 3))
+        self.text.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.text.bind("<Button-5>", lambda e: self.scroll(3))
+        self.text.bind("<Prior>", lambda e: self.scroll(-self.rows()))
+        self.text.bind("<Next>", lambda e: self.scroll(self.rows()))
+        self.text.bind("<Configure>", lambda e: self.render())
+        self.bind("<Destroy>", lambda e: self.close() if e.widget is self else None)
+
+        self.start_indexing()
+        self.render()
+
+    # Re-read the size; called again when the file grows or shrinks
+    def update_size(self):
+        size = os.fstat(self.file.fileno()).st_size
+        with self.lock:
+            self.size = size
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            self.file.close()
+
+    # --- Reading (callers hold self.lock) ---
+
+    # Bytes [start, end) clipped to the file; short if it shrank meanwhile
+    def read(self, start, end):
+        end = min(end, self.size)
+        if self.closed or start >= end:
+            return b""
+        return os.pread(self.file.fileno(), end - start, start)
+
+    # Offset of the first newline at or after pos, -1 if none
+    def find_newline(self, pos):
+        while pos < self.size:
+            chunk = self.read(pos, pos + TEXT_BLOCK)
+            if not chunk:
+                break
+            j = chunk.find(b"\n")
+            if j >= 0:
+                return pos + j
+            pos += len(chunk)
+        return -1
+
+    # Offset of the last newline before end, -1 if none
+    def rfind_newline(self, end):
+        end = min(end, self.size)
+        while end > 0:
+            start = max(0, end - TEXT_BLOCK)
+            chunk = self.read(start, end)
+            if not chunk:
+                break
+            j = chunk.rfind(b"\n")
+            if j >= 0:
+                return start + j
+            end = start
+        return -1
+
+    # --- Line index ---
+
+    def start_indexing(self):
+        with self.lock:
+            if self.indexing:
+                return
+            self.indexing = True
+            generation = self.index_generation
+        threading.Thread(target=self.build_index, args=(generation,), daemon=True).start()
+
+    # Appends to block_lines only under the lock and only while its
+    # generation is current, so a reset in poll() can't be overwritten by a
+    # thread still working through the old file
+    def build_index(self, generation):
+        while True:
+            with self.lock:
+                if self.closed or generation != self.index_generation:
+                    return
+                start = (len(self.block_lines) - 1) * TEXT_BLOCK
+                if start + TEXT_BLOCK > self.size:
+                    self.indexing = False
+                    break
+                data = self.read(start, start + TEXT_BLOCK)
+            count = data.count(b"\n")
+            with self.lock:
+                if generation != self.index_generation:
+                    return
+                self.block_lines.append(self.block_lines[-1] + count)
+                blocks = len(self.block_lines)
+            if blocks % 1024 == 0:
+                post_ui(self.update_status)
+        post_ui(self.update_status)
+
+    # 0-based line number of a byte offset, None if not indexed that far yet
+    def line_of(self, offset):
+        block = offset // TEXT_BLOCK
+        with self.lock:
+            if block >= len(self.block_lines):
+                return None
+            return self.block_lines[block] + self.read(block * TEXT_BLOCK, offset).count(b"\n")
+
+    def total_lines(self):
+        if self.indexing:
+            return None
+        return self.line_of(self.size)
+
+    # Byte offset where 0-based line n starts, None if not indexed that far yet
+    def offset_of(self, n):
+        if n == 0:
+            return 0
+        # Last block with fewer than n newlines before it; line n starts
+        # right after the n-th newline, somewhere from there on
+        with self.lock:
+            block = bisect.bisect_left(self.block_lines, n) - 1
+            if block == len(self.block_lines) - 1 and self.indexing:
+                return None  # past what's been indexed so far
+            remaining = n - self.block_lines[block]
+        return self.forward(block * TEXT_BLOCK, remaining)
+
+    # --- Moving around by lines ---
+
+    def forward(self, pos, n):
+        with self.lock:
+            for _ in range(n):
+                j = self.find_newline(pos)
+                if j < 0 or j + 1 >= self.size:
+                    break
+                pos = j + 1
+        return pos
+
+    def backward(self, pos, n):
+        with self.lock:
+            for _ in range(n):
+                if pos == 0:
+                    break
+                pos = self.rfind_newline(pos - 1) + 1
+        return pos
+
+    def line_start(self, pos):
+        with self.lock:
+            if pos <= 0:
+                return 0
+            return self.rfind_newline(pos) + 1
+
+    def rows(self):
+        shown = int(self.text.index(f"@0,{self.text.winfo_height()}").split(".")[0])
+        return max(1, shown - 1)
+
+    def scroll(self, n):
+        self.top = self.forward(self.top, n) if n > 0 else self.backward(self.top, -n)
+        self.render()
+        return "break"
+
+    def yview(self, *args):
+        if args[0] == "moveto":
+            self.top = self.line_start(int(float(args[1]) * self.size))
+            self.render()
+        elif args[0] == "scroll":
+            n = int(args[1]) * (self.rows() if args[2] == "pages" else 1)
+            self.scroll(n)
+
+    def goto_line_entry(self):
+        try:
+            n = int(self.line_var.get()) - 1
+        except ValueError:
+            return
+        offset = self.offset_of(max(0, n))
+        if offset is None:
+            self.status.configure(text="Still indexing; try again in a moment")
+            return
+        self.top = offset
+        self.render()
+
+    def goto_end(self):
+        self.top = self.backward(self.line_start(self.size - 1), self.rows() - 1)
+        self.render()
+
+    # --- Follow mode ---
+
+    def toggle_follow(self):
+        if self.follow.get():
+            self.goto_end()
+            self.after(TEXT_FOLLOW_MS, self.poll)
+
+    def poll(self):
+        if self.closed or not self.follow.get():
+            return
+        try:
+            size = os.fstat(self.file.fileno()).st_size
+        except (OSError, ValueError):
+            return
+        if size != self.size:
+            if size < self.size:
+                # Truncated or rotated in place: start the index over; the
+                # old thread sees the new generation and drops out
+                with self.lock:
+                    self.block_lines = array("Q", [0])
+                    self.index_generation += 1
+                    self.indexing = False
+                self.top = 0
+            self.update_size()
+            self.start_indexing()
+            self.goto_end()
+        self.after(TEXT_FOLLOW_MS, self.poll)
+
+    # --- Drawing ---
+
+    def render(self):
+        with self.lock:
+            data = self.read(self.top, self.top + TEXT_WINDOW_LINES * 512)
+        lines = data.split(b"\n", TEXT_WINDOW_LINES)[:TEXT_WINDOW_LINES]
+        text = "\n".join(line[:TEXT_MAX_LINE].decode("utf-8", "replace") for line in lines)
+
+        self.text.configure(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.insert("1.0", text)
+        self.text.configure(state="disabled")
+
+        if self.size:
+            self.yscroll.set(self.top / self.size, min(1.0, (self.top + len(data)) / self.size))
+        self.update_status()
+
+    def update_status(self):
+        if self.closed:
+            return
+        line = self.line_of(self.top)
+        total = self.total_lines()
+        where = f"Line {line + 1}" if line is not None else "Line ?"
+        if total is not None:
+            where += f" of {total}"
+        else:
+            with self.lock:
+                indexed = min(1.0, (len(self.block_lines) - 1) * TEXT_BLOCK / max(1, self.size))
+            where += f" (indexing {indexed:.0%})"
+        self.status.configure(text=f"{where}  ·  {format_bytes(self.size)}")
+
+def open_text_viewer(path):
+    window = tk.Toplevel(root)
+    window.title(os.path.basename(path))
+    window.configure(bg=CURRENT_BG)
+    window.geometry("900x600")
+    try:
+        viewer = LargeTextViewer(window, path, width=100)
+    except OSError as e:
+        window.destroy()
+        show_popup("Text Viewer", f"Could not open {os.path.basename(path)}:\n{e}")
+        return
+    viewer.pack(fill="both", expand=True, padx=10, pady=10)
+
 # Largest function by far! Around 450 lines!
 def show_preview(path):
-    global preview_frame
+    global preview_frame, preview_token
     # Clear old preview
     clear_preview()
+    preview_token += 1
 
     preview_frame = tk.Frame(file_frame, bg=CURRENT_BG)
     preview_frame.pack(side="right", fill="both")
@@ -749,19 +2158,24 @@ def show_preview(path):
     # --- Determine file type ---
     ext = os.path.splitext(path)[1].lower()
 
-    # --- Image preview ---
-    if ext in [".png", ".jpg", ".jpeg", ".gif", ".bmp"]:
+    # --- Logs and big text files (memory-mapped viewer) ---
+    if ext in PREVIEW_TEXT_EXTS:
         try:
-            img = Image.open(path)
-            img.thumbnail((280, 280))
-            tkimg = ImageTk.PhotoImage(img)
+            if ext == ".log" or os.path.getsize(path) > LARGE_TEXT_BYTES:
+                LargeTextViewer(preview_frame, path).pack(fill="both", expand=True, padx=10, pady=10)
+                return
+        except (OSError, ValueError) as e:
+            print(f"Text viewer error: {e}")
 
-            lbl = tk.Label(preview_frame, image=tkimg, bg=CURRENT_BG)
-            lbl.image = tkimg
-            lbl.pack(pady=10)
-            return
-        except:
-            pass
+    # --- Images, XML, Markdown and text (worker pipeline) ---
+    if uses_preview_pipeline(ext):
+        request_preview(path, ext)
+        return
+
+    # --- PDF Preview (paged, rendered on the preview workers) ---
+    if ext == ".pdf":
+        show_pdf_preview(path)
+        return
 
     # --- SVG Preview (Zero dependencies! Only tkinterweb) ---
     if ext == ".svg":
@@ -773,34 +2187,6 @@ def show_preview(path):
         except Exception as e:
             print(f"SVG Preview error: {e}")
 
-    # --- PDF Preview (PyMuPDF, only page 1) ---
-    if ext == ".pdf":
-        try:
-            doc = pymupdf.open(path)
-            page = doc.load_page(0)  # Load the first page
-            pix = page.get_pixmap()
-
-            # Create standard PIL image from raw pixel samples
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            img.thumbnail((280, 280))
-            tkimg = ImageTk.PhotoImage(img)
-
-            lbl = tk.Label(preview_frame, image=tkimg, bg=CURRENT_BG)
-            lbl.image = tkimg
-            lbl.pack(pady=10)
-
-            # Subtitle giving the user full page counts
-            page_lbl = tk.Label(
-                preview_frame,
-                text=f"PDF Preview - Page 1 of {len(doc)}",
-                bg=CURRENT_BG,
-                fg=fg,
-            )
-            page_lbl.pack(pady=5)
-            return
-        except Exception as e:
-            print(f"PDF Preview error: {e}")
-
     # --- Pure Audio Preview (Pygame Mixer) ---
     audio_exts = [".mp3", ".wav", ".ogg"]
     if ext in audio_exts:
@@ -841,9 +2227,9 @@ def show_preview(path):
             lbl = tk.Label(preview_frame, bg=CURRENT_BG)
             lbl.pack(pady=10)
 
-            cap = cv2.VideoCapture(path)
-            fps = cap.get(cv2.CAP_PROP_FPS) # Get frames per second of the video
-            
+            player = VideoPlayer(lbl, path)
+            show_video_poster(lbl, path)
+
             audio_loaded = False
             try:
                 pygame.mixer.music.load(path)
@@ -859,52 +2245,13 @@ def show_preview(path):
                 )
                 lbl.pack(pady=50)
 
-            def stream():
-                if not preview_frame.winfo_exists():
-                    cap.release()
-                    if audio_loaded:
-                        pygame.mixer.music.stop()
-                    return
-
-                # Calculate the exact frame target based on audio position
-                if audio_loaded:
-                    # Pygame returns time in milliseconds
-                    current_millis = pygame.mixer.music.get_pos()
-                    # Calculate target frame: (millis / 1000) * frames per second
-                    target_frame = int((current_millis / 1000.0) * fps)
-                    cap.set(cv2.CAP_PROP_POS_FRAMES, target_frame)
-
-                ret, frame = cap.read()
-                if ret:
-                    cv2image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    img = Image.fromarray(cv2image)
-                    img.thumbnail((280, 280))
-
-                    tkimg = ImageTk.PhotoImage(image=img)
-                    lbl.configure(image=tkimg)
-                    lbl.image = tkimg
-
-                    # Schedule the next check (runs fast to keep up with position)
-                    lbl.after(15, stream)
-                else:
-                    # Loop video and audio together at the end
-                    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                    if audio_loaded:
-                        try:
-                            pygame.mixer.music.play()
-                        except:
-                            pass
-                    lbl.after(15, stream)
-
             def stop_video():
-                cap.release()
-                if audio_loaded:
-                    pygame.mixer.music.stop()
+                player.stop()
                 clear_preview()
 
             close_btn.configure(command=stop_video)
 
-            stream()
+            player.play(audio_loaded)
             return
         except Exception as e:
             lbl = tk.Label(
@@ -1007,80 +2354,36 @@ def show_preview(path):
                                     )
 
                                     # Safe pass back to the Main Thread for playback initiation
-                                    if preview_frame.winfo_exists():
-                                        preview_frame.after(0, lambda: start_playback(temp_video, temp_audio, label_widget))
+                                    post_ui(start_playback, temp_video, temp_audio, label_widget)
 
                                 except Exception as thread_err:
-                                    if preview_frame.winfo_exists():
-                                        preview_frame.after(0, lambda t=thread_err: handle_thread_error(t))
+                                    post_ui(handle_thread_error, thread_err)
 
                             # Media initialization and video looping
                             def start_playback(temp_video, temp_audio, caching_lbl):
-                                if caching_lbl.winfo_exists():
-                                    caching_lbl.destroy()
-
-                                # Global scope ensures cv2 capture reference survives outside thread block
-                                global cap
-                                cap = cv2.VideoCapture(temp_video)
-                                
-                                pygame.mixer.music.load(temp_audio)
-                                pygame.mixer.music.play()
+                                # Preview was closed or replaced while downloading
+                                if not caching_lbl.winfo_exists():
+                                    cleanup(temp_video, temp_audio)
+                                    return
+                                caching_lbl.destroy()
 
                                 play_lbl = tk.Label(preview_frame, bg=CURRENT_BG)
                                 play_lbl.pack(pady=10)
 
-                                def stream():
-                                    if not preview_frame.winfo_exists() or not play_lbl.winfo_exists():
-                                        cleanup(temp_video, temp_audio)
-                                        return
-                                    
-                                    current_millis = pygame.mixer.music.get_pos()
-                                    if current_millis < 0:
-                                        loop_media()
-                                        return
-
-                                    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
-                                    target_frame = int((current_millis / 1000.0) * fps)
-                                    
-                                    current_frame = cap.get(cv2.CAP_PROP_POS_FRAMES)
-                                    while current_frame < target_frame:
-                                        if not cap.grab():
-                                            break
-                                        current_frame += 1
-                                    
-                                    ret, frame = cap.read()
-                                    if ret:
-                                        cv2image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                                        img = Image.fromarray(cv2image)
-                                        img.thumbnail((280, 280))
-                                        
-                                        tkimg = ImageTk.PhotoImage(image=img)
-                                        play_lbl.configure(image=tkimg)
-                                        play_lbl.image = tkimg
-                                        play_lbl.after(10, stream)
-                                    else:
-                                        loop_media()
-
-                                def loop_media():
-                                    if play_lbl.winfo_exists():
-                                        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                                        try: 
-                                            pygame.mixer.music.play()
-                                        except: 
-                                            pass
-                                        play_lbl.after(10, stream)
+                                player = VideoPlayer(play_lbl, temp_video,
+                                                     on_stop=lambda: cleanup(temp_video, temp_audio))
+
+                                pygame.mixer.music.load(temp_audio)
+                                pygame.mixer.music.play()
 
                                 def stop_video():
-                                    cleanup(temp_video, temp_audio)
+                                    player.stop()
                                     clear_preview()
 
                                 close_btn.configure(command=stop_video)
-                                stream()
+                                player.play(audio=True)
 
                             def cleanup(v_file, a_file):
-                                global cap
-                                try: cap.release()
-                                except: pass
                                 try:
                                     pygame.mixer.music.stop()
                                     pygame.mixer.music.unload()
@@ -1091,6 +2394,8 @@ def show_preview(path):
                                     except: pass
 
                             def handle_thread_error(err):
+                                if preview_frame is None or not preview_frame.winfo_exists():
+                                    return
                                 for widget in preview_frame.winfo_children():
                                     if widget != close_btn: 
                                         widget.destroy()
@@ -1137,80 +2442,6 @@ def show_preview(path):
         except Exception as e:
             print(f"HTML Preview error: {e}")
 
-    # --- XML preview ---
-    if ext == ".xml":
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                text = f.read(5000)
-
-            try:
-                dom = xml.dom.minidom.parseString(text)
-                text = dom.toprettyxml(indent="  ")
-            except:
-                pass
-
-            txt = tk.Text(preview_frame, bg=CURRENT_BG, fg=fg, wrap="none")
-            txt.insert("1.0", text)
-            txt.configure(state="disabled")
-            txt.pack(fill="both", expand=True, padx=10, pady=10)
-            return
-        except Exception as e:
-            plbl = tk.Label(
-                preview_frame,
-                text=f"XML Preview error: {e}",
-                bg=CURRENT_BG,
-                fg=fg,
-                font=("TkDefaultFont", 12),
-            )
-            lbl.pack(pady=50)
-
-    # -- Markdown preview ---
-    if ext == ".md":
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                md_content = f.read()
-
-            html_output = markdown2.markdown(md_content)
-
-            html_view = HtmlFrame(preview_frame)
-            html_view.load_html(html_output)
-            html_view.pack(fill="both", expand=True, padx=10, pady=10)
-            return
-        except Exception as e:
-            print(f"Markdown Preview error: {e}")
-
-    # --- Text preview ---
-    if ext in [
-        ".txt",
-        ".md",
-        ".json",
-        ".py",
-        ".sh",
-        ".log",
-        ".cfg",
-        ".ini",
-        ".css",
-        ".js",
-    ]:
-        try:
-            with open(path, "r") as f:
-                text = f.read(2000)
-
-            if ext == ".json":
-                try:
-                    obj = json.loads(text)
-                    text = json.dumps(obj, indent=2)
-                except:
-                    pass
-
-            txt = tk.Text(preview_frame, bg=CURRENT_BG, fg=fg, wrap="word")
-            txt.insert("1.0", text)
-            txt.configure(state="disabled")
-            txt.pack(fill="both", expand=True, padx=10, pady=10)
-            return
-        except:
-            pass
-
     # --- Fallback ---
     tk.Label(
         preview_frame, text="No preview available", bg=CURRENT_BG, fg=fg
@@ -1273,6 +2504,9 @@ IMAGE_EXTS = {
     ".bay", ".erf", ".mef", ".pef", ".sr2", ".x3f"    # Miscellaneous Raw
 }
 
+# The ones Pillow (plus any installed plugins) can actually decode
+PREVIEW_IMAGE_EXTS = IMAGE_EXTS & set(Image.registered_extensions())
+
 # --- Script / code files ---
 SCRIPT_EXTS = {
     # Scripting & Shell
@@ -1358,7 +2592,15 @@ def open_file(p):
         return
 
     if ext in TEXT_EXTS:
-        subprocess.Popen(["mousepad", p])
+        # Multi-GB logs are more than an editor wants to load
+        try:
+            large = os.path.getsize(p) > LARGE_TEXT_BYTES
+        except OSError:
+            large = False  # let the editor report it
+        if large:
+            open_text_viewer(p)
+        else:
+            subprocess.Popen(["mousepad", p])
         return
 
     # Everything else -> default handler
@@ -1377,29 +2619,534 @@ def cut_file(path):
     FILE_CLIPBOARD["mode"] = "cut"
     FILE_CLIPBOARD["path"] = path
 
-def delete_file(path):
-    if os.path.isdir(path):
-        shutil.rmtree(path)
+# --- Background jobs ---
+
+# Long file operations run as jobs on JOB_WORKERS threads, each with a row
+# (progress, rate, ETA, Pause, Cancel) under the file list. Workers call
+# checkpoint() between chunks, which blocks while paused and raises
+# JobCancelled once cancelled; run() does the work and cleanup() undoes a
+# partial result.
+
+JOB_WORKERS = 2
+JOB_RATE_WINDOW = 3.0   # seconds of history behind the rate and ETA
+JOB_LINGER_MS = 4000    # finished rows stay this long (failed ones 3x)
+
+class JobCancelled(Exception):
+    pass
+
+class BackgroundJob:
+    unit = "bytes"
+
+    def __init__(self, title):
+        self.title = title
+        self.total = None  # unknown until measured
+        self.done = 0
+        self.state = "queued"
+        self.error = None
+        self.warning = None  # finished, but with something the user should know
+        self.cancelled = threading.Event()
+        self.unpaused = threading.Event()
+        self.unpaused.set()
+        self.samples = deque()  # (time, done), Tk thread only
+
+    def pause(self):
+        if self.state == "running":
+            self.state = "paused"
+            self.unpaused.clear()
+
+    def resume(self):
+        if self.state == "paused":
+            self.state = "running"
+            self.unpaused.set()
+
+    def cancel(self):
+        self.cancelled.set()
+        self.unpaused.set()
+
+    def checkpoint(self):
+        self.unpaused.wait()
+        if self.cancelled.is_set():
+            raise JobCancelled()
+
+    def run(self):
+        pass
+
+    def cleanup(self):
+        pass
+
+    # Whatever happens in run() or cleanup(), the row gets a final state
+    def execute(self):
+        try:
+            self.checkpoint()
+            self.state = "running"
+            self.run()
+            self.state = "done"
+        except JobCancelled:
+            self.state = "cancelled"
+            self.undo()
+        except Exception as e:
+            # OSError is the expected kind; anything else is a bug, reported
+            # with its type so it can be told apart
+            self.state = "failed"
+            self.error = str(e) if isinstance(e, OSError) else f"{type(e).__name__}: {e}"
+            self.undo()
+        post_ui(finish_job, self)
+
+    def undo(self):
+        try:
+            self.cleanup()
+        except Exception as e:
+            print(f"Cleanup after {self.title} failed: {e}")
+
+    # Units per second over the last JOB_RATE_WINDOW seconds
+    def rate(self, now):
+        self.samples.append((now, self.done))
+        while now - self.samples[0][0] > JOB_RATE_WINDOW:
+            self.samples.popleft()
+        t0, done0 = self.samples[0]
+        return (self.done - done0) / (now - t0) if now > t0 else 0.0
+
+    def amount(self, n):
+        return format_bytes(n) if self.unit == "bytes" else f"{n:.0f} {self.unit}"
+
+# --- Transfers ---
+
+# Copy and move. Moves within a filesystem are a single rename; anything
+# else is copied chunk by chunk with copy_file_range (in-kernel, reflinks
+# where the filesystem can), falling back to sendfile and then to plain
+# buffered reads. Cross-device moves delete the source only after the whole
+# copy succeeded. The destination never overwrites: clashes get " (copy)".
+
+TRANSFER_CHUNK = 16 * 1024 * 1024  # bytes per copy_file_range/sendfile call
+TRANSFER_BUFFER = 1024 * 1024      # read/write fallback
+
+def unique_destination(dst_dir, name):
+    base, ext = os.path.splitext(name)
+    candidate = os.path.join(dst_dir, name)
+    n = 1
+    while os.path.lexists(candidate):
+        suffix = " (copy)" if n == 1 else f" (copy {n})"
+        candidate = os.path.join(dst_dir, base + suffix + ext)
+        n += 1
+    return candidate
+
+class TransferJob(BackgroundJob):
+    def __init__(self, mode, src, dst_dir):
+        verb = "Copying" if mode == "copy" else "Moving"
+        super().__init__(f"{verb} {os.path.basename(src)}")
+        self.mode = mode
+        self.src = os.path.abspath(src)
+        self.dst_dir = os.path.abspath(dst_dir)
+        self.dst = None
+        self.method = "copy_file_range" if hasattr(os, "copy_file_range") else "sendfile"
+        self.buffer = None
+
+    def run(self):
+        src, dst_dir = self.src, self.dst_dir
+        if os.path.isdir(src) and os.path.commonpath([src, dst_dir]) == src:
+            raise OSError(errno.EINVAL, "Can't put a folder inside itself")
+
+        if self.mode == "move":
+            if os.path.dirname(src) == dst_dir:
+                return  # Already there
+            self.dst = unique_destination(dst_dir, os.path.basename(src))
+            try:
+                os.rename(src, self.dst)
+                return
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    self.dst = None
+                    raise
+        else:
+            self.dst = unique_destination(dst_dir, os.path.basename(src))
+
+        self.total = self.measure(src)
+        self.copy_tree(src, self.dst)
+
+        # The copy is complete; from here on nothing may roll it back, since
+        # it could be the only whole copy left
+        self.dst = None
+
+        if self.mode == "move":
+            try:
+                if os.path.isdir(src) and not os.path.islink(src):
+                    shutil.rmtree(src)
+                else:
+                    os.remove(src)
+            except OSError as e:
+                self.warning = f"Copied, but the original couldn't be fully removed: {e}"
+
+    def cleanup(self):
+        # Only ever something this job created; a move's source is untouched
+        # until the copy finished
+        if self.dst is None or not os.path.lexists(self.dst):
+            return
+        try:
+            if os.path.isdir(self.dst) and not os.path.islink(self.dst):
+                shutil.rmtree(self.dst)
+            else:
+                os.remove(self.dst)
+        except OSError:
+            pass
+
+    def measure(self, path):
+        total = 0
+        stack = [path]
+        while stack:
+            self.checkpoint()
+            p = stack.pop()
+            st = os.lstat(p)
+            if stat.S_ISDIR(st.st_mode):
+                with os.scandir(p) as it:
+                    stack.extend(entry.path for entry in it)
+            elif stat.S_ISREG(st.st_mode):
+                total += st.st_size
+        return total
+
+    def copy_tree(self, src, dst):
+        st = os.lstat(src)
+        if stat.S_ISLNK(st.st_mode):
+            os.symlink(os.readlink(src), dst)
+        elif stat.S_ISDIR(st.st_mode):
+            os.mkdir(dst)
+            with os.scandir(src) as it:
+                names = [entry.name for entry in it]
+            for name in names:
+                self.copy_tree(os.path.join(src, name), os.path.join(dst, name))
+            shutil.copystat(src, dst)
+        elif stat.S_ISREG(st.st_mode):
+            self.copy_file(src, dst)
+        # Sockets, fifos and devices are skipped
+
+    def copy_file(self, src, dst):
+        with open(src, "rb") as fin, open(dst, "wb") as fout:
+            while True:
+                self.checkpoint()
+                n = self.copy_chunk(fin, fout)
+                if n == 0:
+                    break
+                self.done += n
+        shutil.copystat(src, dst)
+
+    # Both file positions advance whichever way a chunk is copied, so the
+    # method can drop down a level partway through a file
+    def copy_chunk(self, fin, fout):
+        if self.method == "copy_file_range":
+            try:
+                return os.copy_file_range(fin.fileno(), fout.fileno(), TRANSFER_CHUNK)
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                    raise
+                self.method = "sendfile"
+        if self.method == "sendfile":
+            try:
+                return os.sendfile(fout.fileno(), fin.fileno(), None, TRANSFER_CHUNK)
+            except OSError as e:
+                if e.errno not in (errno.ENOSYS, errno.EINVAL):
+                    raise
+                self.method = "read"
+        if self.buffer is None:
+            self.buffer = bytearray(TRANSFER_BUFFER)
+        n = fin.readinto(self.buffer)
+        if n:
+            fout.write(memoryview(self.buffer)[:n])
+        return n
+
+# --- Job rows ---
+
+job_pool = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job")
+job_rows = {}  # job -> (row, bar, info label, pause button)
+jobs_frame = tk.Frame(left_frame, bg=CURRENT_BG)
+
+def start_job(job):
+    fg = "#FFFFFF" if CURRENT_BG != "#FFFFFF" else "#000000"
+
+    row = tk.Frame(jobs_frame, bg=CURRENT_BG)
+    row.pack(fill="x", pady=2)
+    top = tk.Frame(row, bg=CURRENT_BG)
+    top.pack(fill="x")
+    tk.Label(top, text=job.title, bg=CURRENT_BG, fg=fg, anchor="w").pack(side="left")
+    ttk.Button(top, text="Cancel", command=job.cancel).pack(side="right")
+    pause_btn = ttk.Button(top, text="Pause", command=lambda: toggle_job_pause(job))
+    pause_btn.pack(side="right", padx=5)
+    bar = ttk.Progressbar(row, mode="determinate", maximum=1.0)
+    bar.pack(fill="x")
+    info = tk.Label(row, text="Queued", bg=CURRENT_BG, fg=fg, anchor="w")
+    info.pack(fill="x")
+
+    was_idle = not job_rows
+    job_rows[job] = (row, bar, info, pause_btn)
+    if not jobs_frame.winfo_manager():
+        jobs_frame.pack(side="bottom", fill="x", padx=20, pady=(0, 10))
+
+    job_pool.submit(job.execute)
+    if was_idle:
+        update_job_rows()
+
+def toggle_job_pause(job):
+    if job.state == "paused":
+        job.resume()
     else:
-        os.remove(path)
-    refresh_files()
+        job.pause()
+
+def update_job_rows():
+    now = time.monotonic()
+    active = False
+    for job, (row, bar, info, pause_btn) in job_rows.items():
+        if job.state not in ("queued", "running", "paused"):
+            continue
+        active = True
+        if job.state == "queued" or job.total is None:
+            bar.configure(mode="indeterminate")
+            info.configure(text="Queued" if job.state == "queued" else "Measuring…")
+            continue
+
+        bar.configure(mode="determinate", value=job.done / job.total if job.total else 1.0)
+        pause_btn.configure(text="Resume" if job.state == "paused" else "Pause")
+        rate = job.rate(now)
+        text = f"{job.amount(job.done)} of {job.amount(job.total)}"
+        if job.state == "paused":
+            text += " · paused"
+        elif rate > 0:
+            eta = int((job.total - job.done) / rate)
+            text += f" · {job.amount(rate)}/s · ETA {eta // 60}:{eta % 60:02d}"
+        info.configure(text=text)
+
+    if active:
+        root.after(500, update_job_rows)
+
+def finish_job(job):
+    if job not in job_rows:
+        return
+    row, bar, info, pause_btn = job_rows[job]
+    bar.configure(mode="determinate", value=1.0 if job.state == "done" else bar.cget("value"))
+    pause_btn.state(["disabled"])
+    if job.state == "done":
+        info.configure(text=job.warning or "Done")
+    elif job.state == "cancelled":
+        info.configure(text="Cancelled")
+    else:
+        info.configure(text=f"Failed: {job.error}")
+
+    # Without the watcher the list has to be reloaded by hand
+    if directory_watcher is None:
+        refresh_files(files_search_query)
+
+    delay = JOB_LINGER_MS * (3 if job.state == "failed" or job.warning else 1)
+    root.after(delay, lambda: remove_job_row(job))
+
+def remove_job_row(job):
+    row = job_rows.pop(job)[0]
+    row.destroy()
+    if not job_rows:
+        jobs_frame.pack_forget()
+
+# Job workers aren't daemons, so a paused job would keep the process alive
+# after the window closes. Stop everything (running jobs clean up their
+# partial output as on Cancel) and drop what never started.
+def close_window():
+    for job in job_rows:
+        job.cancel()
+    job_pool.shutdown(wait=False, cancel_futures=True)
+    root.destroy()
+
+root.protocol("WM_DELETE_WINDOW", close_window)
+
+# --- Deleting ---
+
+# Deletes are jobs too. Trashing follows the freedesktop spec: the home trash
+# under BASE_DIR/.local/share/Trash for anything on the same device, else
+# $topdir/.Trash/$uid or $topdir/.Trash-$uid on the item's own mount, so it
+# is always a single rename. Permanent deletes walk the tree and unlink item
+# by item so they show progress and can be paused or stopped. Each top-level
+# item is dropped from the file list as soon as it's gone.
+
+HOME_TRASH = os.path.join(BASE_DIR, ".local", "share", "Trash")
+
+# The panel runs under sudo; trash belongs to the user who launched it, the
+# same way BASE_DIR follows SUDO_USER
+TRASH_UID = int(os.environ.get("SUDO_UID", os.getuid()))
+TRASH_GID = int(os.environ.get("SUDO_GID", os.getgid()))
+
+def chown_to_user(path_or_fd):
+    if os.geteuid() == 0:
+        os.chown(path_or_fd, TRASH_UID, TRASH_GID)
+
+# makedirs, but every directory it creates is handed to the user (and gets
+# `mode`, which makedirs only applies to the last one)
+def makedirs_for_user(path, mode=0o755):
+    parent = os.path.dirname(path)
+    if parent != path and not os.path.isdir(parent):
+        makedirs_for_user(parent, mode)
+    try:
+        os.mkdir(path, mode)
+    except FileExistsError:
+        return
+    chown_to_user(path)
+
+def mount_point(path):
+    path = os.path.realpath(path)
+    while not os.path.ismount(path):
+        path = os.path.dirname(path)
+    return path
+
+# (trash dir, prefix Path= is relative to) for where `path` should go
+def trash_dir_for(path):
+    dev = os.lstat(path).st_dev
+    home_base = os.path.dirname(HOME_TRASH)
+    makedirs_for_user(home_base)
+    if os.stat(home_base).st_dev == dev:
+        return HOME_TRASH, None
+
+    top = mount_point(os.path.dirname(os.path.abspath(path)))
+    uid = str(TRASH_UID)
+    shared = os.path.join(top, ".Trash")
+    try:
+        st = os.lstat(shared)
+        # Only usable if it's a real, sticky directory
+        if stat.S_ISDIR(st.st_mode) and st.st_mode & stat.S_ISVTX:
+            return os.path.join(shared, uid), top
+    except OSError:
+        pass
+    return os.path.join(top, ".Trash-" + uid), top
+
+def move_to_trash(path):
+    path = os.path.abspath(path)
+    trash, top = trash_dir_for(path)
+    files_dir = os.path.join(trash, "files")
+    info_dir = os.path.join(trash, "info")
+    for d in (trash, files_dir, info_dir):
+        makedirs_for_user(d, 0o700)
+
+    # Reserve a name by creating its .trashinfo exclusively
+    name = os.path.basename(path)
+    base, ext = os.path.splitext(name)
+    n = 1
+    while True:
+        info_path = os.path.join(info_dir, name + ".trashinfo")
+        try:
+            fd = os.open(info_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            chown_to_user(fd)
+            break
+        except FileExistsError:
+            n += 1
+            name = f"{base}.{n}{ext}"
+
+    original = os.path.relpath(path, top) if top else path
+    with os.fdopen(fd, "w") as f:
+        f.write("[Trash Info]\n"
+                f"Path={urllib.parse.quote(original)}\n"
+                f"DeletionDate={datetime.now().strftime('%Y-%m-%dT%H:%M:%S')}\n")
+
+    try:
+        os.rename(path, os.path.join(files_dir, name))
+    except OSError:
+        os.remove(info_path)
+        raise
+
+class DeleteJob(BackgroundJob):
+    unit = "items"
+
+    def __init__(self, paths, permanent=False):
+        names = ", ".join(os.path.basename(p) for p in paths)
+        super().__init__(f"{'Deleting' if permanent else 'Trashing'} {names}")
+        self.paths = [os.path.abspath(p) for p in paths]
+        self.permanent = permanent
+
+    def run(self):
+        if not self.permanent:
+            self.total = len(self.paths)
+            for path in self.paths:
+                self.checkpoint()
+                move_to_trash(path)
+                self.done += 1
+                post_ui(entry_gone, path)
+            return
+
+        self.total = sum(self.count(p) for p in self.paths)
+        for path in self.paths:
+            self.remove(path)
+            post_ui(entry_gone, path)
+
+    def count(self, path):
+        total = 0
+        stack = [path]
+        while stack:
+            self.checkpoint()
+            p = stack.pop()
+            total += 1
+            if os.path.isdir(p) and not os.path.islink(p):
+                with os.scandir(p) as it:
+                    stack.extend(entry.path for entry in it)
+        return total
+
+    # Depth-first; a directory is removed once everything under it is
+    def remove(self, path):
+        if not os.path.isdir(path) or os.path.islink(path):
+            os.unlink(path)
+            self.done += 1
+            return
+
+        stack = [(path, False)]
+        while stack:
+            p, emptied = stack.pop()
+            if emptied:
+                os.rmdir(p)
+                self.done += 1
+                continue
+            stack.append((p, True))
+            with os.scandir(p) as it:
+                for entry in it:
+                    self.checkpoint()
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, False))
+                    else:
+                        os.unlink(entry.path)
+                        self.done += 1
+
+# Drop a deleted entry from the list right away instead of waiting for a
+# rescan (the watcher's later event for it is then a no-op)
+def entry_gone(path):
+    if os.path.dirname(path) == os.path.abspath(path_var.get()):
+        file_list.patch([], [os.path.basename(path)])
+        file_status.configure(text=f"{len(file_list.entries)} items")
+
+def delete_file(path, permanent=False):
+    if not permanent:
+        start_job(DeleteJob([path]))
+        return
+
+    popup = tk.Toplevel(root)
+    popup.title("Delete Permanently")
+    popup.transient(root)
+    popup.configure(bg=CURRENT_BG)
+    popup.resizable(False, False)
+
+    fg = "#FFFFFF" if CURRENT_BG != "#FFFFFF" else "#000000"
+
+    frame = tk.Frame(popup, bg=CURRENT_BG, padx=15, pady=15)
+    frame.pack(fill="both", expand=True)
+    tk.Label(frame, text=f"Permanently delete “{os.path.basename(path)}”?\nThis can't be undone.",
+             bg=CURRENT_BG, fg=fg, justify="left").pack(pady=(0, 10))
+
+    def do_delete():
+        popup.destroy()
+        start_job(DeleteJob([path], permanent=True))
+
+    buttons = tk.Frame(frame, bg=CURRENT_BG)
+    buttons.pack()
+    ttk.Button(buttons, text="Delete", command=do_delete).pack(side="left", padx=5)
+    ttk.Button(buttons, text="Cancel", command=popup.destroy).pack(side="left", padx=5)
 
 def paste_file():
     if not FILE_CLIPBOARD["path"]:
         return
 
-    src = FILE_CLIPBOARD["path"]
-    dst = os.path.join(path_var.get(), os.path.basename(src))
-
-    if FILE_CLIPBOARD["mode"] == "copy":
-        shutil.copy2(src, dst)
-    else:
-        shutil.move(src, dst)
+    start_job(TransferJob(FILE_CLIPBOARD["mode"], FILE_CLIPBOARD["path"], path_var.get()))
 
     FILE_CLIPBOARD["mode"] = None
     FILE_CLIPBOARD["path"] = None
-    refresh_files()
-    
+
 # File right-click menu
 
 def run_file(p):
@@ -1410,220 +3157,1155 @@ def run_file(p):
         subprocess.Popen(["/bin/bash", p])
         return
 
-    # Python scripts (run, not open)
-    if ext == ".py":
-        subprocess.Popen(["python3", p])
+    # Python scripts (run, not open)
+    if ext == ".py":
+        subprocess.Popen(["python3", p])
+        return
+
+    # Executable bit set
+    if os.access(p, os.X_OK):
+        subprocess.Popen([p])
+        return
+
+    # Fallback
+    subprocess.Popen(["xdg-open", p])
+
+def show_file_menu(event, path, is_exec):
+    menu = tk.Menu(root, tearoff=0,
+                   bg=CURRENT_BG,
+                   fg="#FFFFFF" if CURRENT_BG != "#FFFFFF" else "#000000")
+
+    # Always available; folders open in the list
+    if os.path.isdir(path):
+        menu.add_command(label="Open", command=lambda: (path_var.set(path), refresh_files()))
+    else:
+        menu.add_command(label="Open", command=lambda: open_file(path))
+
+    # Only show Run if executable/script
+    if is_exec:
+        menu.add_command(label="Run", command=lambda: run_file(path))
+
+    # Operations
+    menu.add_separator()
+    menu.add_command(label="Rename", command=lambda: rename_file(path))
+    menu.add_command(label="Move to Trash", command=lambda: delete_file(path))
+    menu.add_command(label="Delete Permanently…", command=lambda: delete_file(path, permanent=True))
+    menu.add_command(label="Copy", command=lambda: copy_file(path))
+    menu.add_command(label="Cut", command=lambda: cut_file(path))
+    menu.add_command(label="Paste", command=paste_file)
+
+    # Show menu at cursor
+    try:
+        menu.tk_popup(event.x_root, event.y_root)
+    finally:
+        menu.grab_release()
+
+# --- Fuzzy matching ---
+def fuzzy_score(query, text):
+    query = query.lower()
+    text = text.lower()
+    score = 0
+    qi = 0
+
+    for char in text:
+        if qi < len(query) and char == query[qi]:
+            score += 2
+            qi += 1
+        elif char in query:
+            score += 1
+
+    return score if qi == len(query) else 0
+
+def fuzzy_match(query, choices):
+    scored = []
+    for c in choices:
+        s = fuzzy_score(query, c)
+        if s > 0:
+            scored.append((s, c))
+
+    # Sort by score descending
+    scored.sort(reverse=True, key=lambda x: x[0])
+
+    # Return only the text values
+    return [c for _, c in scored]
+
+# --- Directory listing ---
+
+# One record per directory entry, built from a single stat() call. Everything
+# the file list needs (sorting, filtering, icons, Run button) reads from here.
+FileEntry = namedtuple("FileEntry", ["name", "path", "is_dir", "size", "mtime",
+                                     "mode", "ext", "category", "is_exec", "sort_key"])
+
+# Which icon a file gets
+def file_category(ext, is_dir, mode):
+    if is_dir:
+        return "folder"
+    if ext in TEXT_EXTS:
+        return "file"
+    if ext in SCRIPT_EXTS:
+        return "script"
+    if ext in IMAGE_EXTS:
+        return "image"
+    if ext in VIDEO_EXTS:
+        return "video"
+    if ext in AUDIO_EXTS:
+        return "audio"
+    if mode & 0o111 or ext == ".desktop":
+        return "exec"
+    return "file"
+
+def make_file_entry(name, path, st):
+    if st is None:
+        # Broken symlink or vanished entry; still list it
+        is_dir, size, mtime, mode = False, 0, 0.0, 0
+    else:
+        is_dir, size, mtime, mode = stat.S_ISDIR(st.st_mode), st.st_size, st.st_mtime, st.st_mode
+    ext = "" if is_dir else os.path.splitext(name)[1].lower()
+
+    # Any execute bit stands in for os.access(X_OK), which would be another syscall
+    is_exec = not is_dir and (bool(mode & 0o111) or ext in (".sh", ".desktop", ".py"))
+
+    return FileEntry(name, path, is_dir, size, mtime, mode, ext,
+                     file_category(ext, is_dir, mode), is_exec, (not is_dir, name.lower()))
+
+def stat_dir_entry(entry):
+    try:
+        return entry.stat()
+    except OSError:
+        try:
+            return entry.stat(follow_symlinks=False)
+        except OSError:
+            return None
+
+def list_directory(path, show_hidden=False):
+    with os.scandir(path) as it:
+        for entry in it:
+            if not show_hidden and entry.name.startswith("."):
+                continue
+            yield make_file_entry(entry.name, entry.path, stat_dir_entry(entry))
+
+# --- Virtual file list ---
+
+# Only the rows that fit in the viewport (plus a little overscan) exist as
+# widgets. Scrolling re-points those pooled rows at different entries, so the
+# widget count stays the same whether the directory has 10 files or 100k.
+class VirtualFileList(tk.Frame):
+    ROW_HEIGHT = 30
+    OVERSCAN = 3
+
+    def __init__(self, parent, on_preview, on_open, on_run, on_menu):
+        super().__init__(parent, bg=CURRENT_BG)
+        self.on_preview = on_preview
+        self.on_open = on_open
+        self.on_run = on_run
+        self.on_menu = on_menu
+
+        self.entries = []
+        self.keys = []    # entries' sort keys, kept alongside for bisect
+        self.offset = 0  # Pixels scrolled from the top
+        self.rows = []
+
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.viewport = tk.Frame(self, bg=CURRENT_BG)
+        self.viewport.pack(side="left", fill="both", expand=True)
+        self.viewport.bind("<Configure>", lambda e: self.render())
+        self.bind_wheel(self.viewport)
+
+    def bind_wheel(self, widget):
+        widget.bind("<Button-4>", lambda e: self.scroll_units(-3))
+        widget.bind("<Button-5>", lambda e: self.scroll_units(3))
+        widget.bind("<MouseWheel>", lambda e: self.scroll_units(-3 if e.delta > 0 else 3))
+
+    def make_row(self):
+        row = tk.Frame(self.viewport, bg=CURRENT_BG)
+        row.entry = None
+        row.run_shown = False
+
+        row.label = tk.Label(row, text="", compound="left", anchor="w",
+                             bg=CURRENT_BG, fg="#FFFFFF" if CURRENT_BG != "#FFFFFF" else "#000000")
+        row.open_btn = ttk.Button(row, text="Open", command=lambda: self.on_open(row.entry))
+        row.run_btn = ttk.Button(row, text="Run", command=lambda: self.on_run(row.entry))
+        row.open_btn.pack(side="right")
+        row.label.pack(side="left", fill="x", expand=True)
+
+        row.label.bind("<Button-1>", lambda e: self.on_preview(row.entry))
+        row.label.bind("<Button-3>", lambda e: self.on_menu(e, row.entry))
+        for widget in (row, row.label, row.open_btn, row.run_btn):
+            self.bind_wheel(widget)
+        return row
+
+    def fill_row(self, row, entry):
+        if row.entry is entry:
+            return
+        row.entry = entry
+        row.label.configure(text=f"  {entry.name}", image=icons[entry.category])
+
+        # Files get Run (when runnable) to the right of Open; folders just Open
+        if entry.is_exec != row.run_shown:
+            if entry.is_exec:
+                row.run_btn.pack(side="right", before=row.open_btn)
+            else:
+                row.run_btn.pack_forget()
+            row.run_shown = entry.is_exec
+
+    def render(self):
+        height = self.viewport.winfo_height()
+        if height <= 1:
+            return
+
+        total = len(self.entries) * self.ROW_HEIGHT
+        self.offset = max(0, min(self.offset, total - height))
+
+        # Grow the pool if the viewport got taller; it never depends on len(entries)
+        needed = height // self.ROW_HEIGHT + 1 + self.OVERSCAN
+        while len(self.rows) < needed:
+            self.rows.append(self.make_row())
+
+        first = self.offset // self.ROW_HEIGHT
+        for i, row in enumerate(self.rows):
+            index = first + i
+            if index < len(self.entries):
+                self.fill_row(row, self.entries[index])
+                row.place(x=0, y=index * self.ROW_HEIGHT - self.offset,
+                          relwidth=1, height=self.ROW_HEIGHT)
+            elif row.entry is not None:
+                row.place_forget()
+                row.entry = None
+
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + height) / total))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def yview(self, *args):
+        total = len(self.entries) * self.ROW_HEIGHT
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * total)
+        elif args[0] == "scroll":
+            step = self.viewport.winfo_height() if args[2] == "pages" else self.ROW_HEIGHT
+            self.offset += int(args[1]) * step
+        self.render()
+
+    def scroll_units(self, rows):
+        self.offset += rows * self.ROW_HEIGHT
+        self.render()
+
+    def set_entries(self, entries):
+        self.entries = entries
+        self.keys = [e.sort_key for e in entries]
+        self.offset = 0
+        self.render()
+
+    # Merge in a batch that is already sorted, keeping the scroll position.
+    # A small batch is placed entry by entry, each a bisect on from the last
+    # with the runs in between copied as slices: O(k log n) Python steps plus
+    # C copies, rather than a key call per entry of the whole list. A batch
+    # that is big next to the list is cheaper as one timsort of two runs.
+    def add_entries(self, entries):
+        if len(entries) * 8 > len(self.entries):
+            self.entries.extend(entries)
+            self.entries.sort(key=lambda e: e.sort_key)
+            self.keys = [e.sort_key for e in self.entries]
+            self.render()
+            return
+
+        merged, keys, prev = [], [], 0
+        for entry in entries:
+            pos = bisect.bisect_right(self.keys, entry.sort_key, prev)
+            merged += self.entries[prev:pos]
+            keys += self.keys[prev:pos]
+            merged.append(entry)
+            keys.append(entry.sort_key)
+            prev = pos
+        merged += self.entries[prev:]
+        keys += self.keys[prev:]
+        self.entries, self.keys = merged, keys
+        self.render()
+
+    # Replace/insert `upserts` and drop `removed` names. Rows whose entry
+    # didn't change keep their widgets untouched.
+    def patch(self, upserts, removed):
+        changed = {e.name for e in upserts} | set(removed)
+        if not changed:
+            return
+        self.entries = [e for e in self.entries if e.name not in changed] + list(upserts)
+        self.entries.sort(key=lambda e: e.sort_key)
+        self.keys = [e.sort_key for e in self.entries]
+        self.render()
+
+# File tab UI
+
+def open_entry(entry):
+    if entry.is_dir:
+        path_var.set(entry.path)
+        refresh_files()
+    else:
+        open_file(entry.path)
+
+# Folders get the menu too now that copy, move and delete handle them
+def file_entry_menu(event, entry):
+    show_file_menu(event, entry.path, entry.is_exec and not entry.is_dir)
+
+# Controls are built once; only the list contents change on refresh
+file_controls = tk.Frame(left_frame, bg=CURRENT_BG)
+file_controls.pack(fill="x")
+
+# Path entry
+ttk.Entry(file_controls, textvariable=path_var).pack(fill="x", padx=10, pady=10)
+
+ttk.Button(file_controls, text="Go", command=lambda: refresh_files()).pack(pady=(0, 10))
+ttk.Button(file_controls, text="New File",
+       command=lambda: create_new_item(path_var.get(), False)).pack(pady=2)
+
+# --- Search Bar ---
+file_search_var = tk.StringVar()
+
+file_search_entry = ttk.Entry(file_controls, textvariable=file_search_var)
+file_search_entry.pack(fill="x", padx=10, pady=(0, 10))
+
+file_search_entry.bind("<Return>", lambda e: run_file_search())
+file_search_entry.bind("<Escape>", lambda e: refresh_files())
+
+# Names (fuzzy, in the list) or contents (grep, in a results pane)
+content_search_mode = tk.BooleanVar(value=False)
+ttk.Checkbutton(file_controls, text="Search file contents", style="My.TButton",
+                variable=content_search_mode).pack(pady=(0, 5))
+
+def run_file_search():
+    query = file_search_var.get().strip()
+    if content_search_mode.get() and query:
+        start_content_search(query)
+    else:
+        refresh_files(search_query=query)
+
+ttk.Button(file_controls, text="New Folder",
+           command=lambda: create_new_item(path_var.get(), True)).pack(pady=2)
+
+show_hidden_check = ttk.Checkbutton(file_controls, text="Show hidden files", style="My.TButton", variable=show_hidden,
+                                    command=lambda: refresh_files(file_search_var.get().strip()))
+show_hidden_check.pack(pady=(0, 10))
+
+file_status = tk.Label(file_controls, text="", bg=CURRENT_BG,
+                       fg="#FFFFFF" if CURRENT_BG != "#FFFFFF" else "#000000")
+file_status.pack()
+
+file_list = VirtualFileList(
+    left_frame,
+    on_preview=lambda e: show_preview(e.path),
+    on_open=open_entry,
+    on_run=lambda e: run_file(e.path),
+    on_menu=file_entry_menu
+)
+file_list.pack(fill="both", expand=True, padx=20, pady=(0, 10))
+
+# Directory listing runs on a worker and streams back in chunks. Every
+# refresh bumps files_generation; chunks from an older generation are
+# dropped and the worker for it stops at its next entry.
+LIST_CHUNK = 500
+files_generation = 0
+
+def list_files_worker(generation, path, hidden, search_query):
+    chunk = []
+    try:
+        for entry in list_directory(path, hidden):
+            if generation != files_generation:
+                return  # User navigated somewhere else
+
+            chunk.append(entry)
+            if len(chunk) >= LIST_CHUNK:
+                post_ui(add_file_chunk, generation, filter_file_chunk(chunk, search_query))
+                chunk = []
+    except OSError:
+        post_ui(finish_file_listing, generation, "Invalid path")
+        return
+
+    post_ui(add_file_chunk, generation, filter_file_chunk(chunk, search_query))
+    post_ui(finish_file_listing, generation)
+
+# Fuzzy scores are per name, so each chunk can be filtered on its own. The
+# result comes back sorted, ready for VirtualFileList.add_entries.
+def filter_file_chunk(chunk, search_query):
+    if search_query:
+        matched = set(fuzzy_match(search_query.lower(), [e.name for e in chunk]))
+        chunk = [e for e in chunk if e.name in matched]
+    return sorted(chunk, key=lambda e: e.sort_key)
+
+# --- Live directory watching ---
+
+# inotify through ctypes, watching whatever directory the list shows. Events
+# are coalesced over a short window, the touched names are re-stat'ed on the
+# watcher thread, and only those entries get patched into the list.
+class DirectoryWatcher:
+    IN_MODIFY = 0x002
+    IN_ATTRIB = 0x004
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_DELETE_SELF = 0x400
+    IN_MOVE_SELF = 0x800
+    IN_Q_OVERFLOW = 0x4000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+            IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+    EVENT = struct.Struct("iIII")  # wd, mask, cookie, name length
+    COALESCE = 0.3                 # seconds to gather events before patching
+
+    def __init__(self, on_change):
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.on_change = on_change
+        self.lock = threading.Lock()
+        self.wd = -1
+        self.target = None  # (path, hidden, generation) of the current watch
+
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def watch(self, path, hidden, generation):
+        with self.lock:
+            if self.wd >= 0:
+                self.libc.inotify_rm_watch(self.fd, self.wd)
+            self.wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), self.MASK)
+            self.target = (path, hidden, generation) if self.wd >= 0 else None
+
+    def read_events(self, names):
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+        overflow = False
+        pos = 0
+        with self.lock:
+            wd = self.wd
+        while pos + self.EVENT.size <= len(data):
+            ev_wd, mask, _, length = self.EVENT.unpack_from(data, pos)
+            name = data[pos + self.EVENT.size:pos + self.EVENT.size + length].rstrip(b"\0")
+            pos += self.EVENT.size + length
+
+            if mask & self.IN_Q_OVERFLOW or (ev_wd == wd and mask & (self.IN_DELETE_SELF | self.IN_MOVE_SELF)):
+                overflow = True
+            elif ev_wd == wd and name:
+                names.add(os.fsdecode(name))
+        return overflow
+
+    def run(self):
+        while True:
+            select.select([self.fd], [], [])
+
+            # Gather everything that arrives within the window
+            names = set()
+            overflow = False
+            deadline = time.monotonic() + self.COALESCE
+            while True:
+                overflow |= self.read_events(names)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                select.select([self.fd], [], [], remaining)
+
+            with self.lock:
+                target = self.target
+            if target is None or not (names or overflow):
+                continue
+            path, hidden, generation = target
+
+            if overflow:
+                post_ui(self.on_change, generation, None, None)
+                continue
+
+            upserts, removed = [], []
+            for name in names:
+                if not hidden and name.startswith("."):
+                    continue
+                full = os.path.join(path, name)
+                try:
+                    st = os.stat(full)
+                except OSError:
+                    try:
+                        st = os.lstat(full)
+                    except OSError:
+                        removed.append(name)
+                        continue
+                upserts.append(make_file_entry(name, full, st))
+
+            post_ui(self.on_change, generation, upserts, removed)
+
+files_search_query = None
+files_loading = False
+pending_file_patches = []
+
+# Runs on Tk with what the watcher saw. upserts is None when the watcher
+# lost track (queue overflow, directory moved/deleted) and a rescan is needed.
+def on_directory_change(generation, upserts, removed):
+    if generation != files_generation:
+        return
+
+    if upserts is None:
+        refresh_files(files_search_query)
+        return
+
+    # Don't race the listing that is still streaming in; apply once it's done
+    if files_loading:
+        pending_file_patches.append((upserts, removed))
+        return
+
+    file_list.patch(filter_file_chunk(upserts, files_search_query), removed)
+    file_status.configure(text=f"{len(file_list.entries)} items")
+
+try:
+    directory_watcher = DirectoryWatcher(on_directory_change)
+except (OSError, AttributeError) as e:
+    print(f"Live directory watching unavailable: {e}")
+    directory_watcher = None
+
+# One pump pass can deliver dozens of chunks; they are collected here and
+# merged into the list once, after the pass
+pending_file_chunks = []  # (generation, sorted chunk)
+
+def add_file_chunk(generation, chunk):
+    if generation != files_generation or not chunk:
+        return
+    if not pending_file_chunks:
+        root.after_idle(flush_file_chunks)
+    pending_file_chunks.append((generation, chunk))
+
+def flush_file_chunks():
+    chunks = [chunk for generation, chunk in pending_file_chunks if generation == files_generation]
+    pending_file_chunks.clear()
+    if not chunks:
+        return
+    # Timsort just merges the already-sorted runs
+    batch = chunks[0] if len(chunks) == 1 else sorted(
+        (e for chunk in chunks for e in chunk), key=lambda e: e.sort_key)
+    file_list.add_entries(batch)
+    file_status.configure(text=f"Loading… {len(file_list.entries)} items")
+
+def finish_file_listing(generation, error=None):
+    global files_loading
+
+    if generation != files_generation:
         return
+    files_loading = False
+    flush_file_chunks()
 
-    # Executable bit set
-    if os.access(p, os.X_OK):
-        subprocess.Popen([p])
+    if error:
+        file_status.configure(text=error)
+        file_list.set_entries([])
         return
 
-    # Fallback
-    subprocess.Popen(["xdg-open", p])
+    # Changes that happened while the listing was streaming in
+    for upserts, removed in pending_file_patches:
+        file_list.patch(filter_file_chunk(upserts, files_search_query), removed)
+    pending_file_patches.clear()
 
-def show_file_menu(event, path, is_exec):
-    menu = tk.Menu(root, tearoff=0,
-                   bg=CURRENT_BG,
-                   fg="#FFFFFF" if CURRENT_BG != "#FFFFFF" else "#000000")
+    file_status.configure(text=f"{len(file_list.entries)} items")
 
-    # Always available
-    menu.add_command(label="Open", command=lambda: open_file(path))
+def refresh_files(search_query=None):
+    global files_generation, files_search_query, files_loading
 
-    # Only show Run if executable/script
-    if is_exec:
-        menu.add_command(label="Run", command=lambda: run_file(path))
+    # A plain refresh clears the search, like the old rebuilt search bar did
+    if search_query is None:
+        file_search_var.set("")
 
-    # Operations
-    menu.add_separator()
-    menu.add_command(label="Rename", command=lambda: rename_file(path))
-    menu.add_command(label="Delete", command=lambda: delete_file(path))
-    menu.add_command(label="Copy", command=lambda: copy_file(path))
-    menu.add_command(label="Cut", command=lambda: cut_file(path))
-    menu.add_command(label="Paste", command=paste_file)
+    if search_query == "../":
+        path_var.set(os.path.abspath(path_var.get() + "/../"))
+        refresh_files()
+        return
 
-    # Show menu at cursor
-    try:
-        menu.tk_popup(event.x_root, event.y_root)
-    finally:
-        menu.grab_release()
+    # Back to the listing if grep results were showing
+    close_content_search()
+
+    files_generation += 1
+    files_search_query = search_query
+    files_loading = True
+    pending_file_patches.clear()
+
+    file_status.configure(text="Loading…")
+    file_list.set_entries([])
+
+    # Watch before listing so nothing that happens in between is missed
+    if directory_watcher is not None:
+        directory_watcher.watch(path_var.get(), show_hidden.get(), files_generation)
+
+    run_async(list_files_worker, files_generation, path_var.get(), show_hidden.get(), search_query)
+
+# --- Content search ---
+
+# grep over everything under path_var. A walker thread feeds file paths to
+# GREP_WORKERS threads through a bounded queue; each worker mmaps its file,
+# skips it if the first GREP_SNIFF bytes contain a NUL, and searches it
+# case-insensitively. An ASCII query runs as a bytes regex straight over the
+# file; re only folds ASCII in bytes patterns, so anything else is decoded
+# GREP_CHUNK bytes (whole lines) at a time and compared with str.casefold(),
+# which also gets ß/SS and friends right. Hits stream back to the results
+# pane through post_ui, one batch per file. A new search, Stop, or reaching
+# GREP_MAX_RESULTS sets the search's cancel event.
+# Python's re holds the GIL, so the threads mostly overlap file I/O; a
+# process pool would have to re-import this whole Tk script in each child.
+
+GREP_WORKERS = 4
+GREP_MAX_RESULTS = 1000
+GREP_SNIFF = 8192
+GREP_SNIPPET = 200
+GREP_CHUNK = 1024 * 1024
+
+class ContentSearch:
+    def __init__(self, root_dir, query, hidden, on_hits, on_done):
+        self.root_dir = root_dir
+        self.needle = query.casefold()
+        self.regex = re.compile(re.escape(query.encode("ascii")), re.IGNORECASE) if query.isascii() else None
+        self.hidden = hidden
+        self.on_hits = on_hits
+        self.on_done = on_done
+        self.cancelled = threading.Event()
+        self.paths = queue.Queue(maxsize=256)
+        self.lock = threading.Lock()
+        self.found = 0
+        self.scanned = 0
+
+    def start(self):
+        threading.Thread(target=self.walk, daemon=True).start()
+        self.workers = [threading.Thread(target=self.work, daemon=True) for _ in range(GREP_WORKERS)]
+        for w in self.workers:
+            w.start()
+        threading.Thread(target=self.wait, daemon=True).start()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def walk(self):
+        stack = [self.root_dir]
+        while stack and not self.cancelled.is_set():
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if not self.hidden and entry.name.startswith("."):
+                            continue
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                self.put(entry.path)
+                        except OSError:
+                            pass
+            except OSError:
+                pass
+        for _ in range(GREP_WORKERS):
+            self.put(None)
 
-# --- Fuzzy matching ---
-def fuzzy_score(query, text):
-    query = query.lower()
-    text = text.lower()
-    score = 0
-    qi = 0
+    def put(self, item):
+        while True:
+            try:
+                self.paths.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                if self.cancelled.is_set() and item is not None:
+                    return
 
-    for char in text:
-        if qi < len(query) and char == query[qi]:
-            score += 2
-            qi += 1
-        elif char in query:
-            score += 1
+    def work(self):
+        while True:
+            path = self.paths.get()
+            if path is None:
+                return
+            if self.cancelled.is_set():
+                continue
+            try:
+                hits = self.grep(path)
+            except (OSError, ValueError):
+                continue
+            if hits:
+                with self.lock:
+                    hits = hits[:GREP_MAX_RESULTS - self.found]
+                    self.found += len(hits)
+                    if self.found >= GREP_MAX_RESULTS:
+                        self.cancelled.set()
+                post_ui(self.on_hits, self, [(path, line, text) for line, text in hits])
+            with self.lock:
+                self.scanned += 1
+
+    # (line number, snippet) for each matching line
+    def grep(self, path):
+        with open(path, "rb") as f:
+            head = f.read(GREP_SNIFF)
+            if not head or b"\0" in head:
+                return []
+            size = os.fstat(f.fileno()).st_size
+            data = head if size <= len(head) else mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                return self.grep_bytes(data) if self.regex is not None else self.grep_folded(data)
+            finally:
+                if data is not head:
+                    data.close()
+
+    def grep_bytes(self, data):
+        hits = []
+        line, last, pos = 1, 0, 0
+        while len(hits) < GREP_MAX_RESULTS and not self.cancelled.is_set():
+            m = self.regex.search(data, pos)
+            if m is None:
+                break
+            start = data.rfind(b"\n", 0, m.start()) + 1
+            end = data.find(b"\n", m.end())
+            if end < 0:
+                end = len(data)
+            line += data[last:start].count(b"\n")
+            last = start
+            snippet = data[start:min(end, start + GREP_SNIPPET)]
+            hits.append((line, snippet.decode("utf-8", "replace").strip()))
+            pos = end + 1  # one hit per line
+        return hits
+
+    def grep_folded(self, data):
+        hits = []
+        line, pos = 1, 0
+        while pos < len(data) and len(hits) < GREP_MAX_RESULTS and not self.cancelled.is_set():
+            # Chunks end after a newline, so no character is split between two
+            end = data.find(b"\n", pos + GREP_CHUNK)
+            end = len(data) if end < 0 else end + 1
+            chunk = data[pos:end]
+            text = chunk.decode("utf-8", "replace")
+            if self.needle in text.casefold():
+                for i, text_line in enumerate(text.split("\n")):
+                    if self.needle in text_line.casefold():
+                        hits.append((line + i, text_line[:GREP_SNIPPET].strip()))
+                        if len(hits) >= GREP_MAX_RESULTS:
+                            break
+            line += chunk.count(b"\n")
+            pos = end
+        return hits
+
+    def wait(self):
+        for w in self.workers:
+            w.join()
+        post_ui(self.on_done, self)
+
+content_search = None
+grep_results = []  # (path, line, snippet) behind the results listbox
+
+grep_frame = tk.Frame(left_frame, bg=CURRENT_BG)
+grep_bar = tk.Frame(grep_frame, bg=CURRENT_BG)
+grep_bar.pack(fill="x")
+grep_status = tk.Label(grep_bar, text="", bg=CURRENT_BG,
+                       fg="#FFFFFF" if CURRENT_BG != "#FFFFFF" else "#000000")
+grep_status.pack(side="left")
+ttk.Button(grep_bar, text="Close", command=lambda: close_content_search()).pack(side="right")
+ttk.Button(grep_bar, text="Stop", command=lambda: content_search and content_search.cancel()).pack(side="right", padx=5)
 
-    return score if qi == len(query) else 0
+grep_list = tk.Listbox(grep_frame, bg=CURRENT_BG, bd=0, highlightthickness=0,
+                       fg="#FFFFFF" if CURRENT_BG != "#FFFFFF" else "#000000")
+grep_scroll = ttk.Scrollbar(grep_frame, orient="vertical", command=grep_list.yview)
+grep_list.configure(yscrollcommand=grep_scroll.set)
+grep_scroll.pack(side="right", fill="y")
+grep_list.pack(fill="both", expand=True)
+
+# Click previews the file, double-click opens it
+def on_grep_select(event, action):
+    sel = grep_list.curselection()
+    if sel:
+        action(grep_results[sel[0]][0])
+
+grep_list.bind("<<ListboxSelect>>", lambda e: on_grep_select(e, show_preview))
+grep_list.bind("<Double-Button-1>", lambda e: on_grep_select(e, open_file))
+
+def start_content_search(query):
+    global content_search
+    if content_search is not None:
+        content_search.cancel()
+
+    grep_results.clear()
+    grep_list.delete(0, "end")
+    grep_status.configure(text=f"Searching for “{query}”…")
+    if not grep_frame.winfo_manager():
+        file_list.pack_forget()
+        grep_frame.pack(fill="both", expand=True, padx=20, pady=(0, 10))
+
+    content_search = ContentSearch(path_var.get(), query, show_hidden.get(),
+                                   add_grep_hits, finish_content_search)
+    content_search.start()
+
+def add_grep_hits(search, hits):
+    if search is not content_search:
+        return
+    base = search.root_dir
+    for path, line, text in hits:
+        grep_results.append((path, line, text))
+        grep_list.insert("end", f"{os.path.relpath(path, base)}:{line}: {text}")
+    grep_status.configure(text=f"{len(grep_results)} matches in {search.scanned} files…")
+
+def finish_content_search(search):
+    if search is not content_search:
+        return
+    text = f"{len(grep_results)} matches in {search.scanned} files"
+    if len(grep_results) >= GREP_MAX_RESULTS:
+        text += f" (stopped at {GREP_MAX_RESULTS})"
+    elif search.cancelled.is_set():
+        text += " (stopped)"
+    grep_status.configure(text=text)
+
+def close_content_search():
+    global content_search
+    if content_search is not None:
+        content_search.cancel()
+        content_search = None
+    if grep_frame.winfo_manager():
+        grep_frame.pack_forget()
+        file_list.pack(fill="both", expand=True, padx=20, pady=(0, 10))
 
-def fuzzy_match(query, choices):
-    scored = []
-    for c in choices:
-        s = fuzzy_score(query, c)
-        if s > 0:
-            scored.append((s, c))
+refresh_files()
 
-    # Sort by score descending
-    scored.sort(reverse=True, key=lambda x: x[0])
+# -------------------------------
+#  Metric Readers
+# -------------------------------
 
-    # Return only the text values
-    return [c for _, c in scored]
+# Everything the dashboard shows is read in-process through psutil (which
+# reads /proc and statvfs directly) instead of forking free/df/hostname.
 
-# File tab UI
-def refresh_files(search_query=None):
-    for child in left_frame.winfo_children():
-        child.destroy()
+# Sensors that are actually the CPU, in order of preference
+CPU_SENSORS = ["cpu_thermal", "coretemp", "k10temp", "zenpower", "soc_thermal", "acpitz"]
 
-    fg = "#FFFFFF" if CURRENT_BG != "#FFFFFF" else "#000000"
+def read_cpu_temp():
+    try:
+        temps = psutil.sensors_temperatures()
+    except (AttributeError, OSError):
+        return None
+    if not temps:
+        return None
+
+    for name in CPU_SENSORS:
+        if temps.get(name):
+            return temps[name][0].current
+
+    # Fall back to the first entry of whatever sensor exists
+    for entries in temps.values():
+        if entries:
+            return entries[0].current
+    return None
+
+# Formatted text plus the raw percentage
+def read_memory():
+    vm = psutil.virtual_memory()
+    used = vm.total - vm.available
+    return f"{format_bytes(used)} / {format_bytes(vm.total)} ({vm.percent:.0f}%)", vm.percent
+
+def read_disk(path="/"):
+    du = psutil.disk_usage(path)
+    return f"{format_bytes(du.used)} / {format_bytes(du.total)} ({du.percent:.0f}%)", du.percent
+
+def read_ip_addresses():
+    addresses = []
+    for nic, addrs in psutil.net_if_addrs().items():
+        for addr in addrs:
+            if addr.family == socket.AF_INET and not addr.address.startswith("127."):
+                addresses.append(addr.address)
+    return " ".join(addresses)
 
-    # Path entry
-    entry = ttk.Entry(left_frame, textvariable=path_var)
-    entry.pack(fill="x", padx=10, pady=10)
+# -------------------------------
+#  Metrics History
+# -------------------------------
 
-    def go():
-        refresh_files()
-        
-    style.configure("My.TButton", 
-                foreground=fg, 
-                background=CURRENT_BG, 
-                font=("Helvetica", 12))
-    
-    ttk.Button(left_frame, text="Go", command=go).pack(pady=(0, 10))
-    ttk.Button(left_frame, text="New File",
-           command=lambda: create_new_item(path_var.get(), False)).pack(pady=2)
-    
-    # --- Search Bar ---
-    search_var = tk.StringVar()
-    
-    search_entry = ttk.Entry(left_frame, textvariable=search_var)
-    search_entry.pack(fill="x", padx=10, pady=(0, 10))
-    
-    def do_search(event=None):
-        refresh_files(search_query=search_var.get().strip())
-        
-    def clear_search(event=None):
-        search_var.set("")
-        refresh_files()
-        
-    search_entry.bind("<Return>", do_search)
-    search_entry.bind("<Escape>", clear_search)
-    
-    ttk.Button(left_frame, text="New Folder",
-               command=lambda: create_new_item(path_var.get(), True)).pack(pady=2)
-    
-    show_hidden_check = ttk.Checkbutton(left_frame, text="Show hidden files", style="My.TButton", variable=show_hidden, command=lambda search_query=search_query: refresh_files(search_query))
-    show_hidden_check.pack(pady=(0, 10))
-    
-    # File list
-    try:
-        if search_query == "../":
-            path_var.set(os.path.abspath(path_var.get() + "/../"))
-            refresh_files()
-            return
-        files = os.listdir(path_var.get())
-        
-        # Filter hidden files unless toggle is on
-        if not show_hidden.get():
-            files = [f for f in files if not f.startswith(".")]
-            
-        if search_query:
-            files = fuzzy_match(search_query.lower(), files)
+# Dashboard samples are kept on disk in three fixed-size ring files (raw,
+# 1-minute and 1-hour averages), so total size is bounded and old data just
+# gets overwritten. Each record is a timestamp plus one float per field.
 
-    except:
-        tk.Label(left_frame, text="Invalid path", bg=CURRENT_BG, fg=fg).pack()
-        return
+METRICS_DIR = HOME_DIR + ".controlpanel_metrics/"
+METRIC_FIELDS = ("cpu", "mem", "disk", "temp")
 
-    files.sort(key=lambda x: (not os.path.isdir(os.path.join(path_var.get(), x)), x.lower())) # Sort files so that directories are first and alphabetically
-    for f in files:
-        full = os.path.join(path_var.get(), f)
-        frame = tk.Frame(left_frame, bg=CURRENT_BG)
-        frame.pack(fill="x", padx=20, pady=2)
+# One ring file. Header: magic, field count, capacity, next slot, record count
+class MetricSeries:
+    HEADER = struct.Struct("<4sIIII")
+    MAGIC = b"FCTS"
 
-        # Choose icon based on file type
-        if os.path.isdir(full):
-            icon = icons["folder"]
+    def __init__(self, path, capacity, fields=len(METRIC_FIELDS)):
+        self.record = struct.Struct("<d" + "f" * fields)
+        self.fields = fields
+        self.capacity = capacity
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+
+        header = os.pread(self.fd, self.HEADER.size, 0)
+        if len(header) == self.HEADER.size:
+            magic, nfields, cap, head, count = self.HEADER.unpack(header)
         else:
-            ext = os.path.splitext(full)[1].lower()
-
-            if ext in TEXT_EXTS:
-                icon = icons["file"]
-            elif ext in SCRIPT_EXTS:
-                icon = icons["script"]
-            elif ext in IMAGE_EXTS:
-                icon = icons["image"]
-            elif ext in VIDEO_EXTS:
-                icon = icons["video"]
-            elif ext in AUDIO_EXTS:
-                icon = icons["audio"]
-            elif os.access(full, os.X_OK) or ext == ".desktop":
-                icon = icons["exec"]
+            magic = None
+
+        # New file, or the layout changed: start over
+        if magic != self.MAGIC or nfields != fields or cap != capacity:
+            os.ftruncate(self.fd, 0)
+            head, count = 0, 0
+            self.write_header(head, count)
+        self.head = head
+        self.count = count
+
+    def write_header(self, head, count):
+        os.pwrite(self.fd, self.HEADER.pack(self.MAGIC, self.fields, self.capacity, head, count), 0)
+
+    def offset(self, slot):
+        return self.HEADER.size + slot * self.record.size
+
+    # Logical index 0 is the oldest record still in the ring
+    def slot(self, index):
+        return (self.head - self.count + index) % self.capacity
+
+    def append(self, ts, values):
+        os.pwrite(self.fd, self.record.pack(ts, *values), self.offset(self.head))
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.write_header(self.head, self.count)
+
+    def timestamp(self, index):
+        return struct.unpack("<d", os.pread(self.fd, 8, self.offset(self.slot(index))))[0]
+
+    # First logical index with a timestamp >= ts (binary search, one small read per probe)
+    def find(self, ts):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.timestamp(mid) < ts:
+                lo = mid + 1
             else:
-                icon = icons["file"]
+                hi = mid
+        return lo
+
+    # Yield (ts, values) from logical index `start` on, reading in chunks
+    def scan(self, start, chunk=512):
+        index = start
+        while index < self.count:
+            slot = self.slot(index)
+            n = min(chunk, self.count - index, self.capacity - slot)
+            data = os.pread(self.fd, n * self.record.size, self.offset(slot))
+            for fields in self.record.iter_unpack(data):
+                yield fields[0], fields[1:]
+            index += n
+
+# Running average for one roll-up bucket
+class MetricBucket:
+    def __init__(self, width):
+        self.width = width
+        self.start = None
+        self.sums = [0.0] * len(METRIC_FIELDS)
+        self.counts = [0] * len(METRIC_FIELDS)
+
+    # Returns (bucket start, averages) when `ts` closes the previous bucket
+    def add(self, ts, values):
+        start = ts - ts % self.width
+        closed = None
+        if self.start is not None and start != self.start:
+            closed = (self.start, [s / c if c else math.nan for s, c in zip(self.sums, self.counts)])
+            self.sums = [0.0] * len(METRIC_FIELDS)
+            self.counts = [0] * len(METRIC_FIELDS)
+        self.start = start
+
+        for i, v in enumerate(values):
+            if not math.isnan(v):
+                self.sums[i] += v
+                self.counts[i] += 1
+        return closed
+
+class MetricStore:
+    # (name, bucket seconds, capacity): ~1 day of 5s samples, a week of
+    # minutes and a year of hours; a little under 1 MB all together
+    TIERS = [("raw", 0, 17280), ("minute", 60, 10080), ("hour", 3600, 8784)]
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.lock = threading.Lock()
+        self.series = {}
+        self.buckets = {}
+        for name, width, capacity in self.TIERS:
+            self.series[name] = MetricSeries(os.path.join(directory, name + ".bin"), capacity)
+            if width:
+                self.buckets[name] = MetricBucket(width)
+
+    # `values` follow METRIC_FIELDS; None means "not available"
+    def append(self, ts, values):
+        values = [math.nan if v is None else float(v) for v in values]
+        with self.lock:
+            self.series["raw"].append(ts, values)
+            for name, bucket in self.buckets.items():
+                closed = bucket.add(ts, values)
+                if closed:
+                    self.series[name].append(*closed)
+
+    # Up to `points` averaged (ts, value) pairs for one field between t0 and t1.
+    # Only the records inside the range are read, never the whole file.
+    def query(self, field, t0, t1, points=300):
+        span = t1 - t0
+        tier = "raw" if span <= 2 * 3600 else "minute" if span <= 3 * 86400 else "hour"
+        column = METRIC_FIELDS.index(field)
+        width = span / points
+
+        out = []
+        bucket_start, total, n = None, 0.0, 0
+        with self.lock:
+            series = self.series[tier]
+            for ts, values in series.scan(series.find(t0)):
+                if ts > t1:
+                    break
+                v = values[column]
+                if math.isnan(v):
+                    continue
+                start = t0 + (ts - t0) // width * width
+                if start != bucket_start:
+                    if n:
+                        out.append((bucket_start + width / 2, total / n))
+                    bucket_start, total, n = start, 0.0, 0
+                total += v
+                n += 1
+        if n:
+            out.append((bucket_start + width / 2, total / n))
+        return out
+
+metric_store = MetricStore(METRICS_DIR)
 
-        # Label with icon + filename
-        label = tk.Label(frame, text=f"  {f}", image=icon, compound="left",
-                         bg=CURRENT_BG, fg=fg)
-        label.image = icon  # prevent garbage collection
-        label.pack(side="left")
-        
-        label.bind("<Button-1>", lambda e, p=full: show_preview(p))
-
-
-        # -----------------------------
-        # DIRECTORY HANDLING
-        # -----------------------------
-        if os.path.isdir(full):
-            ttk.Button(
-                frame,
-                text="Open",
-                command=lambda p=full: path_var.set(p) or refresh_files()
-            ).pack(side="right")
-            continue
+# -------------------------------
+#  Alerts
+# -------------------------------
 
-        # -----------------------------
-        # FILE HANDLING
-        # -----------------------------
-        def open_file(p):
-            ext = os.path.splitext(p)[1].lower()
+# User rules checked against every dashboard sample, on the dashboard thread.
+# A rule looks like:
+#   {"name": "CPU busy", "metric": "cpu", "op": ">", "threshold": 90,
+#    "for": 60, "clear": 80, "cooldown": 600, "action": "Clean Packages"}
+# Metrics: cpu, mem, temp (percent / °C), disk:<mount> (percent used) and
+# proc_rss:<process name> (bytes, thresholds may be written like "2G").
+
+ALERT_METRICS = ["cpu", "mem", "temp", "disk:/", "proc_rss:"]
+
+def parse_size(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip().upper().rstrip("B")
+    for i, unit in enumerate(["K", "M", "G", "T"]):
+        if text.endswith(unit):
+            return float(text[:-1]) * 1024 ** (i + 1)
+    return float(text)
+
+class AlertRule:
+    def __init__(self, config):
+        self.config = config
+        self.name = config["name"]
+        self.metric = config["metric"]
+        if not isinstance(self.metric, str):
+            raise TypeError(f"metric must be a string, not {type(self.metric).__name__}")
+        self.above = config.get("op", ">") == ">"
+        self.threshold = parse_size(config["threshold"])
+        # Hysteresis: once firing, the value has to get back past `clear`
+        self.clear = parse_size(config.get("clear", config["threshold"]))
+        self.hold = float(config.get("for", 0))
+        self.cooldown = float(config.get("cooldown", 300))
+        self.action = config.get("action")
+
+        self.since = None        # when the condition started holding
+        self.active = False      # fired and not yet cleared
+        self.last_fired = None
+
+    # Returns True when the rule should fire now
+    def check(self, value, now):
+        if value is None:
+            return False
 
-            # Python files -> Thonny
-            if ext == ".py":
-                subprocess.Popen(["thonny", p])
-                return
+        if self.active:
+            if (value < self.clear) if self.above else (value > self.clear):
+                self.active = False
+                self.since = None
+            return False
 
-            # Text-based files -> mousepad
-            if ext in TEXT_EXTS:
-                subprocess.Popen(["mousepad", p])
-                return
+        if not ((value > self.threshold) if self.above else (value < self.threshold)):
+            self.since = None
+            return False
 
-            # Everything else -> default handler
-            subprocess.Popen(["xdg-open", p])
+        if self.since is None:
+            self.since = now
+        if now - self.since < self.hold:
+            return False
+        if self.last_fired is not None and now - self.last_fired < self.cooldown:
+            return False
 
-        # -----------------------------
-        # RUN BUTTON (only when valid)
-        # -----------------------------
-        is_exec = ( os.access(full, os.X_OK) or full.endswith(".sh") or full.endswith(".desktop") or full.endswith(".py") )
-        if (is_exec):
-            ttk.Button(frame, text="Run", command=lambda p=full: run_file(p)).pack(side="right")
+        self.active = True
+        self.last_fired = now
+        return True
 
-        # -----------------------------
-        # OPEN BUTTON (always there)
-        # -----------------------------
+class AlertEngine:
+    def __init__(self):
+        self.rules = []  # replaced as a whole by the Tk thread, never mutated
 
-        ttk.Button(frame, text="Open", command=lambda p=full: open_file(p)).pack(side="right")
-        
-        label.bind("<Button-3>", lambda e, p=full, ex=is_exec: show_file_menu(e, p, ex))
+    def load(self):
+        configs = []
+        if os.path.exists(ALERTS_FILE):
+            try:
+                with open(ALERTS_FILE, "r") as f:
+                    data = json.load(f)
+                    if isinstance(data, list):
+                        configs = data
+            except Exception as e:
+                print("Error loading alerts:", e)
+        self.set_rules(configs)
 
-refresh_files()
+    def save(self):
+        try:
+            with open(ALERTS_FILE, "w") as f:
+                json.dump([rule.config for rule in self.rules], f, indent=2)
+        except Exception as e:
+            print("Error saving alerts:", e)
+
+    def set_rules(self, configs):
+        # Rules whose config didn't change keep their hold/cooldown state
+        existing = {id(rule.config): rule for rule in self.rules}
+        rules = []
+        for config in configs:
+            if id(config) in existing:
+                rules.append(existing[id(config)])
+                continue
+            if not isinstance(config, dict):
+                print(f"Skipping bad alert rule {config!r}: not an object")
+                continue
+            try:
+                rules.append(AlertRule(config))
+            except (KeyError, ValueError, TypeError) as e:
+                print(f"Skipping bad alert rule {config}: {e}")
+        self.rules = rules
+
+    def value(self, metric, metrics):
+        if metric in metrics:
+            return metrics[metric]
+        kind, _, arg = metric.partition(":")
+        if kind == "proc_rss":
+            return process_sampler.rss_by_name.get(arg, 0)
+        if kind == "disk":
+            try:
+                return psutil.disk_usage(arg).percent
+            except OSError:
+                return None
+        return None
+
+    # One lookup and comparison per rule
+    def evaluate(self, metrics, now):
+        for rule in self.rules:
+            value = self.value(rule.metric, metrics)
+            if rule.check(value, now):
+                post_ui(fire_alert, rule, value)
+
+def fire_alert(rule, value):
+    if rule.metric.startswith("proc_rss:"):
+        shown = format_bytes(value)
+    else:
+        shown = f"{value:.1f}"
+    show_popup(f"Alert: {rule.name}",
+               f"{rule.metric} is {shown} ({'>' if rule.above else '<'} {rule.config['threshold']})")
+
+    for it in items:
+        if it["name"] == rule.action:
+            run_async(run_item_in_background, it)
+            break
+
+alert_engine = AlertEngine()
+alert_engine.load()
 
 # -------------------------------
 #  Dashboard
@@ -1631,51 +4313,205 @@ refresh_files()
 
 dash = tabs["Dashboard"]
 
-# Draw dashboard UI
-def update_dashboard():
-    for child in dash.winfo_children():
-        child.destroy()
-        
-    add_section(dash, "Dashboard")
+add_section(dash, "Dashboard")
+
+# Built once; each tick only reconfigures the value labels.
+# Main rows on the left, per-core / network / disk panels on the right.
+dash_top = tk.Frame(dash, bg=CURRENT_BG)
+dash_top.pack(fill="x")
+
+dash_rows_frame = tk.Frame(dash_top, bg=CURRENT_BG)
+dash_rows_frame.pack(side="left", fill="x", expand=True, anchor="n")
 
+dash_io_frame = tk.Frame(dash_top, bg=CURRENT_BG)
+dash_io_frame.pack(side="left", fill="x", expand=True, anchor="n")
+
+def add_panel(title):
     fg = "#FFFFFF" if CURRENT_BG != "#FFFFFF" else "#000000"
+    frame = tk.Frame(dash_io_frame, bg=CURRENT_BG)
+    frame.pack(fill="x", padx=20, pady=(0, 5))
+    tk.Label(frame, text=title, bg=CURRENT_BG, fg=fg,
+             font=("TkDefaultFont", 10, "bold")).pack(anchor="w")
+    return frame
+
+cores_panel = add_panel("CPU Cores")
+net_panel = add_panel("Network")
+disk_panel = add_panel("Disk I/O")
+
+# One "label ... value" line on the Dashboard
+class DashboardRow:
+    def __init__(self, parent, label, compact=False):
+        fg = "#FFFFFF" if CURRENT_BG != "#FFFFFF" else "#000000"
+        self.text = None
+        self.color = None
+        size = 10 if compact else 12
+
+        self.frame = tk.Frame(parent, bg=CURRENT_BG)
+        self.frame.pack(fill="x", padx=(10 if compact else 20), pady=(1 if compact else 5))
+
+        tk.Label(self.frame, text=label, bg=CURRENT_BG, fg=fg,
+                 font=("TkDefaultFont", size, "bold")).pack(side="left")
+
+        self.value = tk.Label(self.frame, text="…", bg=CURRENT_BG, fg=fg,
+                              font=("TkDefaultFont", size))
+        self.value.pack(side="right")
+
+    # No Tk call at all when nothing changed. The default colour is looked
+    # up on every call so it follows a theme switch.
+    def set(self, text, color=None):
+        color = color or ("#FFFFFF" if CURRENT_BG != "#FFFFFF" else "#000000")
+        if text != self.text or color != self.color:
+            self.value.configure(text=text, fg=color)
+            self.text = text
+            self.color = color
+
+dashboard_rows = {}
+
+# Rows can be registered at any time (Tk thread only); they are appended
+# below the existing ones and the returned handle is reused on later calls
+def add_row(key, label, parent=None, compact=False):
+    if key not in dashboard_rows:
+        dashboard_rows[key] = DashboardRow(parent or dash_rows_frame, label, compact)
+    return dashboard_rows[key]
+
+add_row("temp", "CPU Temp:")
+add_row("cpu", "CPU Usage:")
+add_row("memory", "Memory:")
+add_row("disk", "Disk:")
+add_row("ip", "IP Address:")
+
+# Per-core CPU and per-interface / per-disk throughput. Rates are deltas
+# between consecutive samples. The dashboard only gets the formatted text;
+# the raw numbers under "rates" are for the metrics endpoint.
+class IOCollector:
+    CORES_PER_ROW = 4
+
+    def __init__(self):
+        self.last_time = None
+        self.last_net = {}
+        self.last_disk = {}
+        self.whole_disks = {}  # name -> is it a whole disk (not a partition/loop)?
+
+    def is_whole_disk(self, name):
+        if name not in self.whole_disks:
+            self.whole_disks[name] = (os.path.exists(f"/sys/block/{name}")
+                                      and not name.startswith(("loop", "ram", "zram")))
+        return self.whole_disks[name]
+
+    def sample(self):
+        now = time.monotonic()
+        dt = now - self.last_time if self.last_time else None
+        self.last_time = now
+
+        # cpu_percent keeps its own previous sample, so this is already a delta
+        cores = psutil.cpu_percent(percpu=True)
+        core_rows = []
+        for first in range(0, len(cores), self.CORES_PER_ROW):
+            chunk = cores[first:first + self.CORES_PER_ROW]
+            label = f"Cores {first}-{first + len(chunk) - 1}:" if len(chunk) > 1 else f"Core {first}:"
+            core_rows.append((label, "  ".join(f"{c:5.1f}%" for c in chunk)))
+
+        rates = {"cores": cores, "net": {}, "disks": {}}
+
+        net = {}
+        for nic, counters in psutil.net_io_counters(pernic=True).items():
+            if nic == "lo":
+                continue
+            last = self.last_net.get(nic)
+            if dt and last:
+                rx = (counters.bytes_recv - last.bytes_recv) / dt
+                tx = (counters.bytes_sent - last.bytes_sent) / dt
+                rates["net"][nic] = {"rx_bytes": max(rx, 0), "tx_bytes": max(tx, 0)}
+                net[nic] = f"↓ {format_bytes(max(rx, 0))}/s   ↑ {format_bytes(max(tx, 0))}/s"
+            else:
+                net[nic] = "…"
+            self.last_net[nic] = counters
+
+        disks = {}
+        for name, counters in (psutil.disk_io_counters(perdisk=True) or {}).items():
+            if not self.is_whole_disk(name):
+                continue
+            last = self.last_disk.get(name)
+            if dt and last:
+                reads = (counters.read_count - last.read_count) / dt
+                writes = (counters.write_count - last.write_count) / dt
+                rbytes = (counters.read_bytes - last.read_bytes) / dt
+                wbytes = (counters.write_bytes - last.write_bytes) / dt
+                rates["disks"][name] = {"reads": reads, "writes": writes,
+                                        "read_bytes": max(rbytes, 0), "write_bytes": max(wbytes, 0)}
+                disks[name] = (f"R {reads:.0f}/s {format_bytes(max(rbytes, 0))}/s   "
+                               f"W {writes:.0f}/s {format_bytes(max(wbytes, 0))}/s")
+            else:
+                disks[name] = "…"
+            self.last_disk[name] = counters
 
-    # CPU Temp
-    
-    temps = psutil.sensors_temperatures()
-    if temps:
-        for name, entries in temps.items():
-            for entry in entries:
-                celsius = entry.current
-                fahrenheit = (celsius * 9/5) + 32
-                temp = f"{celsius:.1f}°C / {fahrenheit:.1f}°F"
-                break
-    else:
-        temp = "N/A"
-        fahrenheit = 95
+        return {"cores": core_rows, "net": net, "disks": disks, "rates": rates}
+
+io_collector = IOCollector()
+
+# Runs on the dashboard thread; only plain values go back to Tk
+def read_dashboard_sample():
+    sample = {"temp_c": read_cpu_temp(), "cpu_percent": psutil.cpu_percent(None)}
 
     # Memory
     try:
-        mem = subprocess.check_output("free -h", shell=True).decode().splitlines()[1]
-    except:
-        mem = "N/A"
+        sample["memory"], sample["mem_percent"] = read_memory()
+    except Exception:
+        sample["memory"], sample["mem_percent"] = "N/A", None
 
     # Disk
     try:
-        disk = subprocess.check_output("df -h /", shell=True).decode().splitlines()[1]
-    except:
-        disk = "N/A"
+        sample["disk"], sample["disk_percent"] = read_disk("/")
+    except Exception:
+        sample["disk"], sample["disk_percent"] = "N/A", None
 
     # IP
     try:
-        ip = subprocess.check_output("hostname -I", shell=True).decode().strip()
-    except:
-        ip = "N/A"
+        sample["ip"] = read_ip_addresses() or "N/A"
+    except Exception:
+        sample["ip"] = "N/A"
+
+    # Per-core CPU, network and disk throughput
+    try:
+        sample["io"] = io_collector.sample()
+    except Exception as e:
+        print(f"I/O sample error: {e}")
+        sample["io"] = {"cores": [], "net": {}, "disks": {},
+                        "rates": {"cores": [], "net": {}, "disks": {}}}
+
+    return sample
+
+# Latest full sample, for anything that wants it without re-sampling (metrics endpoint)
+latest_sample = None
+latest_sample_time = None
+
+def dashboard_loop():
+    global latest_sample, latest_sample_time
+    while True:
+        sample = read_dashboard_sample()
+        latest_sample, latest_sample_time = sample, time.time()
+        try:
+            metric_store.append(time.time(), [sample["cpu_percent"], sample["mem_percent"],
+                                              sample["disk_percent"], sample["temp_c"]])
+        except OSError as e:
+            print(f"Metrics history error: {e}")
+        alert_engine.evaluate({"cpu": sample["cpu_percent"], "mem": sample["mem_percent"],
+                               "temp": sample["temp_c"], "disk:/": sample["disk_percent"]},
+                              time.time())
+        post_ui(update_dashboard, sample)
+        time.sleep(REFRESH_INTERVAL)
+
+# Draw dashboard UI
+def update_dashboard(sample):
+    # CPU Temp
+    celsius = sample["temp_c"]
+    if celsius is not None:
+        fahrenheit = (celsius * 9/5) + 32
+        temp = f"{celsius:.1f}°C / {fahrenheit:.1f}°F"
+    else:
+        temp = "N/A"
+        fahrenheit = 95
 
-    # --- Styled Dashboard Layout ---
-    row = tk.Frame(dash, bg=CURRENT_BG)
-    row.pack(pady=10, anchor="w")
-    
     # Color-code based on Fahrenheit
     if fahrenheit < 110:
         temp_color = "#4CAF50"   # green
@@ -1684,25 +4520,273 @@ def update_dashboard():
     else:
         temp_color = "#F44336"   # red
 
+    dashboard_rows["temp"].set(temp, temp_color)
+    dashboard_rows["cpu"].set(f"{sample['cpu_percent']:.1f}%")
+    dashboard_rows["memory"].set(sample["memory"])
+    dashboard_rows["disk"].set(sample["disk"])
+    dashboard_rows["ip"].set(sample["ip"])
+
+    # Right-hand panels; rows appear as cores / interfaces / disks are first seen
+    io_rates = sample["io"]
+    for index, (label, text) in enumerate(io_rates["cores"]):
+        add_row(f"io_core:{index}", label, cores_panel, compact=True).set(text)
+    for nic, text in io_rates["net"].items():
+        add_row(f"io_net:{nic}", f"{nic}:", net_panel, compact=True).set(text)
+    for name, text in io_rates["disks"].items():
+        add_row(f"io_disk:{name}", f"{name}:", disk_panel, compact=True).set(text)
+
+    # Interfaces/disks that went away
+    for key, row in dashboard_rows.items():
+        kind, _, name = key.partition(":")
+        if (kind == "io_net" and name not in io_rates["net"]) or (kind == "io_disk" and name not in io_rates["disks"]):
+            row.set("gone")
+
+# --- History chart ---
+
+CHART_METRICS = {"CPU %": "cpu", "Memory %": "mem", "Disk %": "disk", "CPU Temp °C": "temp"}
+CHART_RANGES = {"1 hour": 3600, "24 hours": 86400, "7 days": 7 * 86400, "30 days": 30 * 86400}
+
+chart_frame = tk.Frame(dash, bg=CURRENT_BG)
+chart_frame.pack(fill="both", expand=True, padx=20, pady=(10, 10))
+
+chart_controls = tk.Frame(chart_frame, bg=CURRENT_BG)
+chart_controls.pack(fill="x")
+
+chart_metric_var = tk.StringVar(value="CPU %")
+chart_range_var = tk.StringVar(value="1 hour")
+ttk.Combobox(chart_controls, textvariable=chart_metric_var, values=list(CHART_METRICS),
+             state="readonly", width=14).pack(side="left")
+ttk.Combobox(chart_controls, textvariable=chart_range_var, values=list(CHART_RANGES),
+             state="readonly", width=10).pack(side="left", padx=10)
+
+chart_canvas = tk.Canvas(chart_frame, height=150, bg=CURRENT_BG, highlightthickness=0)
+chart_canvas.pack(fill="both", expand=True, pady=(5, 0))
+
+def refresh_chart(*_):
+    field = CHART_METRICS[chart_metric_var.get()]
+    span = CHART_RANGES[chart_range_var.get()]
+    width = max(chart_canvas.winfo_width(), 100)
+
+    def work():
+        t1 = time.time()
+        points = metric_store.query(field, t1 - span, t1, points=width // 3)
+        post_ui(draw_chart, points, t1 - span, t1)
+
+    run_async(work)
+
+def draw_chart(points, t0, t1):
+    chart_canvas.delete("all")
+    fg = "#FFFFFF" if CURRENT_BG != "#FFFFFF" else "#000000"
+    w = chart_canvas.winfo_width()
+    h = chart_canvas.winfo_height()
+    pad = 20
+
+    if not points:
+        chart_canvas.create_text(w // 2, h // 2, text="No history yet", fill=fg)
+        return
+
+    values = [v for _, v in points]
+    lo = min(0.0, min(values))
+    hi = max(values) if CHART_METRICS[chart_metric_var.get()] == "temp" else 100.0
+    hi = max(hi, lo + 1)
+
+    def xy(ts, v):
+        x = pad + (ts - t0) / (t1 - t0) * (w - 2 * pad)
+        y = h - pad - (v - lo) / (hi - lo) * (h - 2 * pad)
+        return x, y
+
+    chart_canvas.create_line(pad, h - pad, w - pad, h - pad, fill=fg)
+    chart_canvas.create_text(pad, pad - 10, text=f"{hi:.0f}", fill=fg, anchor="w")
+    chart_canvas.create_text(pad, h - pad + 10, text=f"{lo:.0f}", fill=fg, anchor="w")
+
+    # Break the line where there is no data (panel wasn't running)
+    gap = 3 * (t1 - t0) / max(len(points), 1)
+    segment = []
+    last_ts = None
+    for ts, v in points:
+        if last_ts is not None and ts - last_ts > gap:
+            if len(segment) >= 4:
+                chart_canvas.create_line(*segment, fill="#2196F3", width=2)
+            segment = []
+        segment.extend(xy(ts, v))
+        last_ts = ts
+    if len(segment) >= 4:
+        chart_canvas.create_line(*segment, fill="#2196F3", width=2)
+
+def chart_loop():
+    refresh_chart()
+    chart_canvas.after(30000, chart_loop)
+
+chart_metric_var.trace_add("write", refresh_chart)
+chart_range_var.trace_add("write", refresh_chart)
+chart_canvas.after(1000, chart_loop)
+
+# Axis and labels are drawn in the text colour
+theme_hooks.append(refresh_chart)
+
+threading.Thread(target=dashboard_loop, daemon=True).start()
+
+# -------------------------------
+#  Metrics Endpoint
+# -------------------------------
+
+# Optional HTTP endpoint on localhost for headless scraping:
+#   /metrics          Prometheus text format
+#   /metrics.json     latest dashboard sample
+#   /processes.json   latest process snapshot
+# Requests only read what the dashboard thread and process sampler already
+# published; they never touch Tk or trigger a psutil sweep of their own.
+
+EXPORT_PORT = 9105
+EXPORT_WORKERS = 4
+
+def prom_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def render_prometheus():
+    lines = []
+    def metric(name, help_text, kind, samples):
+        lines.append(f"# HELP firecenter_{name} {help_text}")
+        lines.append(f"# TYPE firecenter_{name} {kind}")
+        for labels, value in samples:
+            if value is None:
+                continue
+            label_text = ",".join(f'{k}="{prom_label(v)}"' for k, v in labels.items())
+            lines.append(f"firecenter_{name}{{{label_text}}} {value}" if label_text
+                         else f"firecenter_{name} {value}")
+
+    sample = latest_sample
+    if sample:
+        rates = sample["io"]["rates"]
+        metric("cpu_percent", "Total CPU utilisation.", "gauge", [({}, sample["cpu_percent"])])
+        metric("memory_percent", "Memory in use.", "gauge", [({}, sample["mem_percent"])])
+        metric("disk_percent", "Disk space used.", "gauge", [({"mount": "/"}, sample["disk_percent"])])
+        metric("cpu_temperature_celsius", "CPU temperature.", "gauge", [({}, sample["temp_c"])])
+        metric("core_cpu_percent", "Per-core CPU utilisation.", "gauge",
+               [({"core": i}, v) for i, v in enumerate(rates["cores"])])
+        metric("network_receive_bytes_per_second", "Per-interface receive rate.", "gauge",
+               [({"interface": nic}, r["rx_bytes"]) for nic, r in rates["net"].items()])
+        metric("network_transmit_bytes_per_second", "Per-interface transmit rate.", "gauge",
+               [({"interface": nic}, r["tx_bytes"]) for nic, r in rates["net"].items()])
+        for key, help_text in [("reads", "Read operations per second."),
+                               ("writes", "Write operations per second."),
+                               ("read_bytes", "Bytes read per second."),
+                               ("write_bytes", "Bytes written per second.")]:
+            metric(f"disk_{key}_per_second", help_text, "gauge",
+                   [({"disk": name}, r[key]) for name, r in rates["disks"].items()])
+        metric("sample_timestamp_seconds", "When the dashboard last sampled.", "gauge",
+               [({}, latest_sample_time)])
+
+    snapshot = process_sampler.snapshot
+    metric("process_cpu_percent", "Per-process CPU utilisation.", "gauge",
+           [({"pid": p.pid, "name": p.name}, p.cpu) for p in snapshot])
+    metric("process_resident_bytes", "Per-process resident memory.", "gauge",
+           [({"pid": p.pid, "name": p.name}, p.rss) for p in snapshot])
+
+    return "\n".join(lines) + "\n"
+
+class MetricsHandler(http.server.BaseHTTPRequestHandler):
+    timeout = 5  # a stalled client can't hold a worker forever
+
+    def send_body(self, body, content_type):
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            self.send_body(render_prometheus(), "text/plain; version=0.0.4; charset=utf-8")
+        elif path == "/metrics.json":
+            self.send_body(json.dumps({"timestamp": latest_sample_time, "sample": latest_sample}),
+                           "application/json")
+        elif path == "/processes.json":
+            self.send_body(json.dumps([
+                {"pid": p.pid, "ppid": p.ppid, "name": p.name, "cpu_percent": p.cpu,
+                 "memory_percent": p.mem, "rss": p.rss}
+                for p in process_sampler.snapshot
+            ]), "application/json")
+        else:
+            self.send_error(404)
+
+    def log_message(self, format, *args):
+        pass  # Keep scrapes out of the terminal
+
+# HTTPServer that hands each connection to a fixed-size pool instead of a new thread
+class MetricsServer(http.server.HTTPServer):
+    def __init__(self, address, workers=EXPORT_WORKERS):
+        super().__init__(address, MetricsHandler)
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self.handle_in_pool, request, client_address)
+
+    def handle_in_pool(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=False)
 
-    def add_row(label, value, color=None):
-        frame = tk.Frame(dash, bg=CURRENT_BG)
-        frame.pack(fill="x", padx=20, pady=5)
+metrics_server = None
 
-        tk.Label(frame, text=label, bg=CURRENT_BG, fg=fg,
-                 font=("TkDefaultFont", 12, "bold")).pack(side="left")
+def start_metrics_server():
+    global metrics_server
+    if metrics_server is not None:
+        return
+    try:
+        metrics_server = MetricsServer(("127.0.0.1", EXPORT_PORT))
+    except OSError as e:
+        show_popup("Metrics Endpoint", f"Could not listen on port {EXPORT_PORT}:\n{e}")
+        return
+    threading.Thread(target=metrics_server.serve_forever, daemon=True).start()
+
+def stop_metrics_server():
+    global metrics_server
+    server, metrics_server = metrics_server, None
+    if server is not None:
+        # shutdown() blocks until serve_forever notices, keep that off Tk
+        run_async(lambda: (server.shutdown(), server.server_close()))
 
-        tk.Label(frame, text=value, bg=CURRENT_BG, fg=color if color else fg,
-                 font=("TkDefaultFont", 12)).pack(side="right")
+def load_export_setting():
+    try:
+        with open(EXPORT_FILE, "r") as f:
+            return f.read().strip() == "on"
+    except OSError:
+        return False
+
+def toggle_metrics_export(state):
+    with open(EXPORT_FILE, "w") as f:
+        f.write("on" if state else "off")
+    if state:
+        start_metrics_server()
+    else:
+        stop_metrics_server()
 
-    add_row("CPU Temp:", temp, temp_color)
-    add_row("Memory:", mem)
-    add_row("Disk:", disk)
-    add_row("IP Address:", ip)
+ttk.Label(settings, text=f"Metrics Endpoint (localhost:{EXPORT_PORT})").pack(pady=(10, 0))
 
-    dash.after(dash_interval.get() * 1000, lambda: run_async(update_dashboard))
+export_toggle = ToggleSwitch(
+    settings,
+    width=35,
+    height=17.5,
+    bg_on="#2196F3",
+    bg_off="#555555",
+    circle_color="#FFFFFF",
+    initial=load_export_setting(),
+    command=toggle_metrics_export
+)
+export_toggle.pack(pady=10)
 
-update_dashboard()
+if load_export_setting():
+    start_metrics_server()
 
 # -------------------------------
 #  Favorites
@@ -1795,7 +4879,8 @@ def load_plugins():
                 if "register" in mod:
                     mod["register"](PLUGIN_API)
             except Exception as e:
-                show_popup(
+                post_ui(
+                    show_popup,
                     f"Plugin Load Error: {module_name}",
                     f"Plugin failed during register:\n{e}"
                 )
@@ -2204,13 +5289,10 @@ def scheduler_loop():
         now = datetime.now().strftime("%H:%M")
         for task in scheduled_tasks[:]:
             if task["time"] == now:
-                # Run task
-                if task["type"] == "script":
-                    run_script_with_popup(task["name"], task["path"])
-                else:
-                    run_inline_with_popup(task["name"], task["command"], task["kind"])
+                # Own thread, so a long command can't hold up the other tasks
+                run_async(run_item_in_background, task)
                 scheduled_tasks.remove(task)
-                refresh_task_list()
+                post_ui(refresh_task_list)
         time.sleep(1)
 
 threading.Thread(target=scheduler_loop, daemon=True).start()
@@ -2288,6 +5370,347 @@ def schedule_task():
 
 ttk.Button(sched_frame, text="Schedule", command=schedule_task).pack(pady=10)
 
+# -------------------------------
+#  Alerts UI (Settings tab)
+# -------------------------------
+
+add_section(settings, "Alerts")
+
+alerts_list_frame = tk.Frame(settings, bg=CURRENT_BG)
+alerts_list_frame.pack(fill="x", padx=20)
+
+def refresh_alerts_list():
+    for child in alerts_list_frame.winfo_children():
+        child.destroy()
+
+    fg = "#FFFFFF" if CURRENT_BG != "#FFFFFF" else "#000000"
+
+    if not alert_engine.rules:
+        tk.Label(alerts_list_frame, text="No alert rules.",
+                 bg=CURRENT_BG, fg=fg).pack()
+        return
+
+    for rule in alert_engine.rules:
+        row = tk.Frame(alerts_list_frame, bg=CURRENT_BG)
+        row.pack(fill="x", pady=2)
+
+        c = rule.config
+        text = f"{c['name']}: {c['metric']} {c.get('op', '>')} {c['threshold']}"
+        if rule.hold:
+            text += f" for {rule.hold:.0f}s"
+        if rule.action:
+            text += f" → {rule.action}"
+        tk.Label(row, text=text, bg=CURRENT_BG, fg=fg).pack(side="left", padx=5)
+
+        def remove_rule(r=rule):
+            alert_engine.set_rules([x.config for x in alert_engine.rules if x is not r])
+            alert_engine.save()
+            refresh_alerts_list()
+
+        ttk.Button(row, text="Remove", command=remove_rule).pack(side="right")
+
+def add_alert_popup():
+    popup = tk.Toplevel(root)
+    popup.title("New Alert")
+    popup.configure(bg=CURRENT_BG)
+    popup.resizable(False, False)
+
+    fg = "#FFFFFF" if CURRENT_BG != "#FFFFFF" else "#000000"
+
+    # Labelled row; gets a plain Entry when given a variable
+    def field(label, var=None):
+        row = tk.Frame(popup, bg=CURRENT_BG)
+        row.pack(fill="x", padx=10, pady=3)
+        tk.Label(row, text=label, bg=CURRENT_BG, fg=fg, width=14, anchor="w").pack(side="left")
+        if var is not None:
+            ttk.Entry(row, textvariable=var).pack(side="left", fill="x", expand=True)
+        return row
+
+    name_var = tk.StringVar()
+    metric_var = tk.StringVar(value="cpu")
+    op_var = tk.StringVar(value=">")
+    threshold_var = tk.StringVar(value="90")
+    for_var = tk.StringVar(value="60")
+    clear_var = tk.StringVar()
+    cooldown_var = tk.StringVar(value="600")
+    action_var = tk.StringVar(value="(none)")
+
+    field("Name", name_var)
+    row = field("Metric")
+    ttk.Combobox(row, textvariable=metric_var, values=ALERT_METRICS).pack(side="left", fill="x", expand=True)
+    row = field("Condition")
+    ttk.Combobox(row, textvariable=op_var, values=[">", "<"], state="readonly", width=3).pack(side="left")
+    ttk.Entry(row, textvariable=threshold_var).pack(side="left", fill="x", expand=True)
+    field("For (seconds)", for_var)
+    field("Clear at", clear_var)
+    field("Cooldown (s)", cooldown_var)
+    row = field("Run")
+    ttk.Combobox(row, textvariable=action_var, state="readonly",
+                 values=["(none)"] + [it["name"] for it in items]).pack(side="left", fill="x", expand=True)
+
+    def do_add():
+        config = {
+            "name": name_var.get().strip() or metric_var.get(),
+            "metric": metric_var.get().strip(),
+            "op": op_var.get(),
+            "threshold": threshold_var.get().strip()
+        }
+        if clear_var.get().strip():
+            config["clear"] = clear_var.get().strip()
+        if action_var.get() != "(none)":
+            config["action"] = action_var.get()
+
+        try:
+            config["for"] = float(for_var.get().strip() or 0)
+            config["cooldown"] = float(cooldown_var.get().strip() or 0)
+            AlertRule(config)
+        except (KeyError, ValueError, TypeError) as e:
+            show_popup("Alert Error", f"Invalid rule: {e}")
+            return
+
+        alert_engine.set_rules([r.config for r in alert_engine.rules] + [config])
+        alert_engine.save()
+        refresh_alerts_list()
+        popup.destroy()
+
+    ttk.Button(popup, text="Add", command=do_add).pack(pady=10)
+
+ttk.Button(settings, text="Add Alert", command=add_alert_popup).pack(pady=10)
+refresh_alerts_list()
+
+
+# -------------------------------
+#  File Index
+# -------------------------------
+
+# Recursive name index behind the Search tab, kept in SQLite under HOME_DIR.
+# Roots and excludes live in INDEX_FILE:
+#   {"roots": ["/home/me"], "exclude": [".cache", "node_modules", "*.pyc"]}
+# Excludes are fnmatch patterns tried against both the name and full path.
+# Later runs only re-list directories whose mtime changed.
+
+INDEX_INTERVAL = 600  # seconds between incremental passes
+INDEX_BATCH = 2000    # rows per write transaction
+INDEX_RANK_CAP = 2000 # matches considered when ranking a search
+INDEX_DEFAULTS = {
+    "roots": [BASE_DIR],
+    "exclude": [".cache", ".git", "node_modules", "__pycache__", ".local/share/Trash",
+                os.path.basename(INDEX_DB) + "*"]
+}
+
+class FileIndex:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.config = dict(INDEX_DEFAULTS)
+        self.lock = threading.Lock()  # one pass at a time
+        self.wake = threading.Event()
+        self.full = False  # next pass re-lists everything (settings changed)
+        self.status = "Not indexed yet"
+
+        db = self.connect()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, mtime REAL)")
+        db.execute("CREATE TABLE IF NOT EXISTS files (id INTEGER PRIMARY KEY, dir TEXT, "
+                   "name TEXT, is_dir INTEGER)")
+        db.execute("CREATE INDEX IF NOT EXISTS files_dir ON files (dir)")
+
+        # Trigram FTS makes substring search an index lookup; older SQLite
+        # builds without it fall back to LIKE over the files table.
+        try:
+            db.execute("CREATE VIRTUAL TABLE IF NOT EXISTS names USING fts5"
+                       "(name, content='files', content_rowid='id', tokenize='trigram')")
+            db.executescript("""
+                CREATE TRIGGER IF NOT EXISTS files_ai AFTER INSERT ON files BEGIN
+                    INSERT INTO names (rowid, name) VALUES (new.id, new.name);
+                END;
+                CREATE TRIGGER IF NOT EXISTS files_ad AFTER DELETE ON files BEGIN
+                    INSERT INTO names (names, rowid, name) VALUES ('delete', old.id, old.name);
+                END;
+            """)
+            self.fts = True
+        except sqlite3.OperationalError:
+            self.fts = False
+        db.commit()
+        db.close()
+
+        # Reads come from the Tk thread on their own connection
+        self.reader = self.connect(check_same_thread=False)
+
+    def connect(self, **kwargs):
+        db = sqlite3.connect(self.db_path, timeout=30, **kwargs)
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def load(self):
+        try:
+            with open(INDEX_FILE, "r") as f:
+                self.config = {**INDEX_DEFAULTS, **json.load(f)}
+        except (OSError, ValueError):
+            self.config = dict(INDEX_DEFAULTS)
+
+    def save(self):
+        try:
+            with open(INDEX_FILE, "w") as f:
+                json.dump(self.config, f, indent=2)
+        except OSError as e:
+            print(f"Failed to save index settings: {e}")
+
+    def excluded(self, name, path):
+        return any(fnmatch.fnmatch(name, pat) or fnmatch.fnmatch(path, pat) or
+                   path.endswith("/" + pat) for pat in self.config["exclude"])
+
+    # Walk every root. Unchanged directories are only stat'ed; their
+    # subdirectories come from the index instead of a fresh listing.
+    def update(self):
+        with self.lock:
+            started = time.perf_counter()
+            db = self.connect()
+            if self.full:
+                db.execute("UPDATE dirs SET mtime = -1")
+                self.full = False
+            known = dict(db.execute("SELECT path, mtime FROM dirs"))
+            seen = set()
+            pending = 0
+            relisted = 0
+
+            stack = [os.path.abspath(r) for r in self.config["roots"] if os.path.isdir(r)]
+            while stack:
+                path = stack.pop()
+                if path in seen:
+                    continue
+                try:
+                    mtime = os.stat(path).st_mtime
+                except OSError:
+                    continue
+                seen.add(path)
+
+                if known.get(path) == mtime:
+                    stack.extend(os.path.join(path, name) for (name,) in db.execute(
+                        "SELECT name FROM files WHERE dir = ? AND is_dir = 1", (path,)))
+                    continue
+
+                # Re-list and diff against what the index had
+                relisted += 1
+                current = {}
+                try:
+                    with os.scandir(path) as it:
+                        for entry in it:
+                            if self.excluded(entry.name, entry.path):
+                                continue
+                            try:
+                                current[entry.name] = entry.is_dir(follow_symlinks=False)
+                            except OSError:
+                                pass
+                except OSError:
+                    continue
+
+                old = dict(db.execute("SELECT name, is_dir FROM files WHERE dir = ?", (path,)))
+                gone = [n for n in old if old[n] != current.get(n)]
+                added = [(path, n, int(d)) for n, d in current.items() if old.get(n) != d]
+                db.executemany("DELETE FROM files WHERE dir = ? AND name = ?",
+                               [(path, n) for n in gone])
+                db.executemany("INSERT INTO files (dir, name, is_dir) VALUES (?, ?, ?)", added)
+                db.execute("INSERT OR REPLACE INTO dirs (path, mtime) VALUES (?, ?)", (path, mtime))
+                stack.extend(os.path.join(path, n) for n, d in current.items() if d)
+
+                pending += len(gone) + len(added) + 1
+                if pending >= INDEX_BATCH:
+                    db.commit()
+                    pending = 0
+                    self.status = f"Indexing… {len(seen)} folders"
+
+            # Directories that vanished, or are now excluded or outside the roots
+            stale = [(p,) for p in known if p not in seen]
+            db.executemany("DELETE FROM files WHERE dir = ?", stale)
+            db.executemany("DELETE FROM dirs WHERE path = ?", stale)
+            db.commit()
+
+            count = db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+            db.close()
+            self.status = (f"{count} paths in {len(seen)} folders "
+                           f"({relisted} re-listed, {time.perf_counter() - started:.1f}s)")
+
+    def run(self):
+        while True:
+            try:
+                self.update()
+            except sqlite3.Error as e:
+                self.status = f"Index error: {e}"
+            self.wake.wait(INDEX_INTERVAL)
+            self.wake.clear()
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def reindex(self, full=False):
+        self.full = self.full or full
+        self.wake.set()
+
+    # Substring search over names; shortest names first since those are
+    # usually what's meant. Only the first INDEX_RANK_CAP hits get ranked so
+    # a very common fragment can't turn into a sort of the whole index.
+    # Returns (full path, is_dir) pairs.
+    def search(self, query, limit=30):
+        query = query.strip()
+        if not query:
+            return []
+        if self.fts and len(query) >= 3:
+            inner = ("SELECT f.dir, f.name, f.is_dir FROM names JOIN files f ON f.id = names.rowid "
+                     "WHERE names MATCH ?")
+            arg = '"' + query.replace('"', '""') + '"'
+        else:
+            inner = "SELECT dir, name, is_dir FROM files WHERE name LIKE ? ESCAPE '\\'"
+            arg = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        sql = f"SELECT * FROM ({inner} LIMIT {INDEX_RANK_CAP}) ORDER BY length(name) LIMIT ?"
+        try:
+            rows = self.reader.execute(sql, (arg, limit)).fetchall()
+        except sqlite3.Error as e:
+            print(f"Index search failed: {e}")
+            return []
+        return [(os.path.join(d, n), bool(is_dir)) for d, n, is_dir in rows]
+
+try:
+    file_index = FileIndex(INDEX_DB)
+    file_index.load()
+    file_index.start()
+except sqlite3.Error as e:
+    print(f"File index unavailable: {e}")
+    file_index = None
+
+# --- Settings ---
+
+add_section(settings, "File Index")
+
+index_roots_var = tk.StringVar()
+index_exclude_var = tk.StringVar()
+
+for label, var in (("Roots (separated by :)", index_roots_var),
+                   ("Exclude (separated by :)", index_exclude_var)):
+    ttk.Label(settings, text=label).pack(anchor="w", padx=20)
+    ttk.Entry(settings, textvariable=var).pack(fill="x", padx=20, pady=(0, 5))
+
+index_status = ttk.Label(settings, text="")
+index_status.pack(pady=5)
+
+def save_index_settings():
+    file_index.config = {
+        "roots": [r for r in index_roots_var.get().split(":") if r.strip()],
+        "exclude": [x for x in index_exclude_var.get().split(":") if x.strip()]
+    }
+    file_index.save()
+    file_index.reindex(full=True)
+
+def refresh_index_status():
+    index_status.configure(text=file_index.status)
+    root.after(2000, refresh_index_status)
+
+if file_index is not None:
+    index_roots_var.set(":".join(file_index.config["roots"]))
+    index_exclude_var.set(":".join(file_index.config["exclude"]))
+    ttk.Button(settings, text="Save and Reindex", command=save_index_settings).pack(pady=(0, 10))
+    refresh_index_status()
+else:
+    index_status.configure(text="File index unavailable")
 
 # -------------------------------
 #  Search Tab
@@ -2406,27 +5829,21 @@ def do_search(*args):
             )
         })
 
-    def get_dirname(p):
-        if os.path.isdir(p):
-            return p
-        
-        return os.path.dirname(p)
-
-    # Files (non-recursive for now)
-    for f in os.listdir(path_var.get()):
-        sources.append({
-            "name": f,
-            "tab": "Files",
-            "type": "file",
-            "path": os.path.join(path_var.get(), f),
-            "command": lambda p=os.path.join(path_var.get(), f): (
-                print(p),
-                path_var.set(get_dirname(p)),
-                print(path_var.get()),
-                refresh_files(),
-                notebook.select(tabs["Files"])
-            )
-        })
+    # Files anywhere under the index roots
+    file_hits = []
+    if file_index is not None:
+        for p, is_dir in file_index.search(query):
+            file_hits.append({
+                "name": os.path.relpath(p, BASE_DIR) if p.startswith(BASE_DIR + "/") else p,
+                "tab": "Files",
+                "type": "file",
+                "path": p,
+                "command": lambda p=p, is_dir=is_dir: (
+                    path_var.set(p if is_dir else os.path.dirname(p)),
+                    refresh_files(),
+                    notebook.select(tabs["Files"])
+                )
+            })
 
     # Fuzzy yay
     names = [
@@ -2440,7 +5857,7 @@ def do_search(*args):
         n for n in names if query in n.lower()
     ]
 
-    if not matches:
+    if not matches and not file_hits:
         lbl = tk.Label(results_container,
                        text="No matches.\nTry to search for files, plugins, commands, tabs",
                        bg=CURRENT_BG, fg=fg)
@@ -2457,6 +5874,10 @@ def do_search(*args):
     # Filter out any Nones
     matched_items = [item for item in matched_items if item is not None]
 
+    # Index hits are already ranked and paths can share a name, so they
+    # skip the name-based fuzzy mapping above
+    matched_items += file_hits
+
 
     # Group them
     grouped = {}
@@ -0,0 +1,54 @@
+# Cost of one dashboard tick's system reads.
+#
+#   python tests/bench_dashboard_tick.py [ticks]
+#
+# Times the body of the old update_dashboard() (psutil temperatures, then
+# "free -h", "df -h /" and "hostname -I" through a shell) against the
+# in-process readers it now uses. Tk is left out; both sides only read and
+# format the values.
+
+import subprocess
+import sys
+import time
+
+import psutil
+
+from main_defs import load
+
+def old_tick():
+    temps = psutil.sensors_temperatures()
+    if temps:
+        for name, entries in temps.items():
+            for entry in entries:
+                celsius = entry.current
+                f"{celsius:.1f}°C / {celsius * 9 / 5 + 32:.1f}°F"
+                break
+    for cmd in ("free -h", "df -h /", "hostname -I"):
+        try:
+            subprocess.check_output(cmd, shell=True)
+        except (OSError, subprocess.CalledProcessError):
+            pass
+
+def new_tick(main):
+    main.read_cpu_temp()
+    main.read_memory()
+    main.read_disk()
+    main.read_ip_addresses()
+
+def per_tick_ms(func, ticks):
+    func()  # warm up
+    start = time.perf_counter()
+    for _ in range(ticks):
+        func()
+    return (time.perf_counter() - start) * 1000 / ticks
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    readers = load("format_bytes", "CPU_SENSORS", "read_cpu_temp", "read_memory",
+                   "read_disk", "read_ip_addresses")
+    print(f"{ticks} ticks, psutil {psutil.__version__}")
+    print(f"  shell-outs (before): {per_tick_ms(old_tick, ticks):.2f} ms/tick")
+    print(f"  in-process (after):  {per_tick_ms(lambda: new_tick(readers), ticks):.2f} ms/tick")
+
+if __name__ == "__main__":
+    main()
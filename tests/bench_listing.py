@@ -0,0 +1,84 @@
+# Directory listing cost on a big directory.
+#
+#   python tests/bench_listing.py [files]
+#
+# Builds a temp dir of N files (default 50,000) plus N/100 directories and
+# times listing, sorting and picking an icon category / Run flag per entry:
+#   before  os.listdir() plus isdir()/access()/splitext() per entry, the way
+#           refresh_files() used to do it
+#   after   list_directory() and FileEntry.sort_key
+# Tk is left out; both sides stop where the widgets would be created.
+
+import os
+import sys
+import tempfile
+import time
+
+from main_defs import load
+
+EXTS = (".txt", ".py", ".jpg", ".mp4", ".mp3", ".sh", ".bin", "")
+
+def make_tree(root, files):
+    for i in range(files // 100):
+        os.mkdir(os.path.join(root, f"dir{i:05}"))
+    for i in range(files):
+        with open(os.path.join(root, f"File{i:06}{EXTS[i % len(EXTS)]}"), "w"):
+            pass
+
+def list_before(main, path):
+    files = [f for f in os.listdir(path) if not f.startswith(".")]
+    files.sort(key=lambda x: (not os.path.isdir(os.path.join(path, x)), x.lower()))
+    rows = []
+    for f in files:
+        full = os.path.join(path, f)
+        if os.path.isdir(full):
+            category = "folder"
+        else:
+            ext = os.path.splitext(full)[1].lower()
+            if ext in main.TEXT_EXTS:
+                category = "file"
+            elif ext in main.SCRIPT_EXTS:
+                category = "script"
+            elif ext in main.IMAGE_EXTS:
+                category = "image"
+            elif ext in main.VIDEO_EXTS:
+                category = "video"
+            elif ext in main.AUDIO_EXTS:
+                category = "audio"
+            elif os.access(full, os.X_OK) or ext == ".desktop":
+                category = "exec"
+            else:
+                category = "file"
+        is_dir = os.path.isdir(full)
+        is_exec = (os.access(full, os.X_OK) or full.endswith(".sh")
+                   or full.endswith(".desktop") or full.endswith(".py"))
+        rows.append((f, category, is_dir, is_exec))
+    return rows
+
+def list_after(main, path):
+    entries = list(main.list_directory(path))
+    entries.sort(key=lambda e: e.sort_key)
+    return [(e.name, e.category, e.is_dir, e.is_exec) for e in entries]
+
+def best_of(func, runs=3):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    defs = load("TEXT_EXTS", "SCRIPT_EXTS", "IMAGE_EXTS", "VIDEO_EXTS", "AUDIO_EXTS",
+                "FileEntry", "file_category", "make_file_entry", "stat_dir_entry",
+                "list_directory")
+    with tempfile.TemporaryDirectory() as tmp:
+        make_tree(tmp, files)
+        assert len(list_before(defs, tmp)) == len(list_after(defs, tmp))
+        print(f"{files} files + {files // 100} dirs, best of 3")
+        print(f"  listdir + isdir/access/splitext (before): {best_of(lambda: list_before(defs, tmp)):.2f} s")
+        print(f"  scandir + FileEntry (after):              {best_of(lambda: list_after(defs, tmp)):.2f} s")
+
+if __name__ == "__main__":
+    main()
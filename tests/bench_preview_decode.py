@@ -0,0 +1,88 @@
+# Preview decode latency and peak memory on large images.
+#
+#   python tests/bench_preview_decode.py [megapixels]
+#
+# Writes synthetic JPEG/PNG/TIFF/WebP files of the given size (default 50 MP)
+# to a temp dir, then times three ways of getting a 280x280 preview, each in
+# a fresh process. Memory is how far the case pushed peak RSS above where it
+# stood after imports, so small decodes can read as ~0 MB. Methods:
+#   full      Image.open().load() then thumbnail() (a complete decode)
+#   previous  Image.open().thumbnail(), what show_preview() used to do
+#   reduced   make_thumbnail(), the draft()/reduce() path
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from PIL import Image
+
+from main_defs import load
+
+BOX = (280, 280)
+FORMATS = {"JPEG": ".jpg", "PNG": ".png", "TIFF": ".tif", "WEBP": ".webp"}
+METHODS = ("full", "previous", "reduced")
+
+# VmHWM rather than ru_maxrss: the latter survives exec, so every case
+# would inherit the parent's peak from generating the image
+def peak_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+def run_case(method, path):
+    # Loaded for every method so all cases start from the same baseline
+    make_thumbnail = load("REDUCE_MODES", "decode_reduced", "stretch_to_8bit",
+                          "make_thumbnail").make_thumbnail
+    base = peak_mb()
+    start = time.perf_counter()
+    if method == "full":
+        img = Image.open(path)
+        img.load()
+        img.thumbnail(BOX)
+    elif method == "previous":
+        Image.open(path).thumbnail(BOX)
+    else:
+        make_thumbnail(path, BOX)
+    elapsed = time.perf_counter() - start
+    print(f"{elapsed * 1000:.0f} {peak_mb() - base:.0f}")
+
+def make_image(megapixels):
+    width = int((megapixels * 1e6 * 3 / 2) ** 0.5)
+    height = int(width * 2 / 3)
+    # Noise over a gradient, so the encoders have real detail to chew on
+    grad = Image.linear_gradient("L").resize((width, height))
+    noise = Image.effect_noise((width, height), 40)
+    return Image.merge("RGB", (grad, noise, Image.blend(grad, noise, 0.5)))
+
+def main():
+    megapixels = float(sys.argv[1]) if len(sys.argv) > 1 else 50
+    img = make_image(megapixels)
+    print(f"{img.width}x{img.height}, {BOX[0]}x{BOX[1]} box, Pillow {Image.__version__}")
+    print(f"{'format':8}" + "".join(f"{m:>22}" for m in METHODS))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt, ext in FORMATS.items():
+            path = os.path.join(tmp, "bench" + ext)
+            try:
+                img.save(path, fmt)
+            except (OSError, KeyError) as e:
+                print(f"{fmt:8} skipped: {e}")
+                continue
+
+            cells = []
+            for method in METHODS:
+                out = subprocess.run([sys.executable, __file__, "--case", method, path],
+                                     capture_output=True, text=True, check=True).stdout
+                ms, mb = out.split()[-2:]
+                cells.append(f"{ms} ms / {mb} MB")
+            print(f"{fmt:8}" + "".join(f"{c:>22}" for c in cells))
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--case":
+        run_case(sys.argv[2], sys.argv[3])
+    else:
+        main()
@@ -0,0 +1,39 @@
+# main.py builds the whole Tk window at import time, so tests and benchmarks
+# can't import it. load() picks the named top-level functions, classes and
+# constants out of it instead and runs just those (plus main.py's imports,
+# minus Tk and anything not installed) in a fresh namespace.
+
+import ast
+import os
+import types
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+def is_tk_import(node):
+    if isinstance(node, ast.ImportFrom):
+        return (node.module or "").startswith("tkinter")
+    return any(alias.name.startswith("tkinter") for alias in node.names)
+
+def load(*names, **extra):
+    with open(MAIN, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), MAIN)
+
+    ns = {"__name__": "main_defs"}
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)) and not is_tk_import(node):
+            try:
+                exec(compile(ast.Module([node], []), MAIN, "exec"), ns)
+            except ImportError:
+                pass
+    ns.update(extra)
+
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            wanted = node.name in names
+        elif isinstance(node, ast.Assign):
+            wanted = any(isinstance(t, ast.Name) and t.id in names for t in node.targets)
+        else:
+            wanted = False
+        if wanted:
+            exec(compile(ast.Module([node], []), MAIN, "exec"), ns)
+    return types.SimpleNamespace(**ns)
@@ -0,0 +1,42 @@
+import json
+
+from main_defs import load
+
+def engine_for(tmp_path, rules):
+    path = tmp_path / "alerts.json"
+    path.write_text(json.dumps(rules))
+    main = load("parse_size", "AlertRule", "AlertEngine", ALERTS_FILE=str(path))
+    engine = main.AlertEngine()
+    engine.load()
+    return engine
+
+def test_bad_rules_are_skipped_not_fatal(tmp_path):
+    good = {"name": "hot", "metric": "temp", "op": ">", "threshold": 80}
+    engine = engine_for(tmp_path, [
+        good,
+        {"name": "null hold", "metric": "cpu", "threshold": 90, "for": None},
+        {"name": "null cooldown", "metric": "cpu", "threshold": 90, "cooldown": None},
+        {"name": "no metric name", "metric": 5, "threshold": 90},
+        {"name": "no threshold", "metric": "cpu"},
+        {"name": "bad threshold", "metric": "cpu", "threshold": "lots"},
+        "cpu > 90",
+        None,
+        42,
+        ["cpu", 90],
+    ])
+    assert [rule.config for rule in engine.rules] == [good]
+
+def test_rules_file_that_is_not_a_list_loads_no_rules(tmp_path):
+    assert engine_for(tmp_path, {"name": "hot"}).rules == []
+
+def test_hold_and_cooldown(tmp_path):
+    engine = engine_for(tmp_path, [{"name": "hot", "metric": "temp", "threshold": 80,
+                                    "clear": 70, "for": 10, "cooldown": 60}])
+    rule = engine.rules[0]
+    assert not rule.check(85, 0)
+    assert rule.check(85, 10)
+    assert not rule.check(85, 11)     # still active
+    assert not rule.check(65, 12)     # cleared
+    assert not rule.check(85, 30)
+    assert not rule.check(85, 40)     # held, but inside the cooldown
+    assert rule.check(85, 70)
@@ -0,0 +1,25 @@
+from main_defs import load
+
+def grep(tmp_path, query, text, chunk=None):
+    extra = {"GREP_CHUNK": chunk} if chunk else {}
+    main = load("GREP_MAX_RESULTS", "GREP_SNIFF", "GREP_SNIPPET", "GREP_CHUNK",
+                "ContentSearch", **extra)
+    path = tmp_path / "notes.txt"
+    path.write_text(text, encoding="utf-8")
+    return main.ContentSearch(str(tmp_path), query, False, None, None).grep(str(path))
+
+def test_ascii_query_ignores_case(tmp_path):
+    assert grep(tmp_path, "error", "ok\nERROR: disk\nfine\n") == [(2, "ERROR: disk")]
+
+def test_non_ascii_query_folds_unicode_case(tmp_path):
+    text = "Café ouvert\nCAFÉ FERMÉ\ncafe\nStraße\n"
+    assert grep(tmp_path, "café", text) == [(1, "Café ouvert"), (2, "CAFÉ FERMÉ")]
+    assert grep(tmp_path, "STRASSE", text) == []  # ASCII query: ASCII folding only
+    assert grep(tmp_path, "ÉOUVERT", text) == []
+    assert grep(tmp_path, "straße", "STRASSE\n") == [(1, "STRASSE")]
+
+def test_line_numbers_carry_across_chunks(tmp_path):
+    text = "".join(f"line {i} {'ü' if i % 7 == 0 else 'u'}\n" for i in range(1, 2000))  # past GREP_SNIFF, so mmapped
+    hits = grep(tmp_path, "Ü", text, chunk=4096)
+    assert [line for line, _ in hits] == list(range(7, 2000, 7))
+    assert hits[0] == (7, "line 7 ü")
@@ -0,0 +1,46 @@
+import threading
+
+from main_defs import load
+
+def load_jobs():
+    finished = []
+    main = load("JobCancelled", "BackgroundJob",
+                post_ui=lambda func, *args: finished.append(args[0]), finish_job=None)
+    return main, finished
+
+def test_unexpected_error_fails_the_job_and_reports_it():
+    main, finished = load_jobs()
+
+    class Broken(main.BackgroundJob):
+        def run(self):
+            raise KeyError("size")
+
+        def cleanup(self):
+            raise RuntimeError("cleanup broke too")
+
+    job = Broken("broken")
+    job.execute()
+    assert job.state == "failed"
+    assert job.error == "KeyError: 'size'"
+    assert finished == [job]
+
+def test_cancel_releases_a_paused_job():
+    main, finished = load_jobs()
+    started = threading.Event()
+
+    class Waiting(main.BackgroundJob):
+        def run(self):
+            started.set()
+            while True:
+                self.checkpoint()
+
+    job = Waiting("waiting")
+    worker = threading.Thread(target=job.execute)
+    worker.start()
+    started.wait(5)
+    job.pause()
+    job.cancel()
+    worker.join(5)
+    assert not worker.is_alive()
+    assert job.state == "cancelled"
+    assert finished == [job]
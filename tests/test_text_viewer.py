@@ -0,0 +1,65 @@
+import threading
+import types
+from array import array
+
+from main_defs import load
+
+# Only the file and index side of the viewer; its widgets need a display
+def open_viewer(path, block=16):
+    main = load("LargeTextViewer", TEXT_BLOCK=block, tk=types.SimpleNamespace(Frame=object),
+                post_ui=lambda func, *args: None)
+    viewer = main.LargeTextViewer.__new__(main.LargeTextViewer)
+    viewer.file = open(path, "rb")
+    viewer.lock = threading.Lock()
+    viewer.size = 0
+    viewer.block_lines = array("Q", [0])
+    viewer.index_generation = 0
+    viewer.indexing = True
+    viewer.closed = False
+    viewer.update_size()
+    return viewer
+
+def write_lines(tmp_path, lines):
+    path = tmp_path / "big.log"
+    path.write_bytes(b"".join(line + b"\n" for line in lines))
+    return path
+
+def test_index_finds_every_line(tmp_path):
+    lines = [b"x" * (i % 37) for i in range(500)]
+    viewer = open_viewer(write_lines(tmp_path, lines))
+    viewer.build_index(0)
+    assert not viewer.indexing
+
+    offset = 0
+    for n, line in enumerate(lines):
+        assert viewer.offset_of(n) == offset
+        assert viewer.line_of(offset) == n
+        offset += len(line) + 1
+    assert viewer.total_lines() == len(lines)
+    viewer.close()
+
+def test_moves_across_lines_longer_than_a_block(tmp_path):
+    lines = [b"a", b"b" * 100, b"c"]
+    viewer = open_viewer(write_lines(tmp_path, lines))
+    assert viewer.forward(0, 1) == 2
+    assert viewer.forward(0, 2) == 103
+    assert viewer.forward(0, 5) == 103  # stops on the last line
+    assert viewer.backward(103, 1) == 2
+    assert viewer.backward(103, 2) == 0
+    assert viewer.line_start(80) == 2
+    viewer.close()
+
+def test_stale_index_thread_leaves_a_reset_index_alone(tmp_path):
+    viewer = open_viewer(write_lines(tmp_path, [b"line"] * 100))
+    # poll() reset the index while a thread for the old file was running
+    viewer.index_generation = 1
+    viewer.build_index(0)
+    assert list(viewer.block_lines) == [0]
+    assert viewer.indexing  # still owned by the new generation's thread
+    viewer.close()
+
+def test_reads_stop_after_close(tmp_path):
+    viewer = open_viewer(write_lines(tmp_path, [b"line"] * 10))
+    viewer.close()
+    with viewer.lock:
+        assert viewer.read(0, 10) == b""
@@ -0,0 +1,60 @@
+import os
+import threading
+
+from PIL import Image, ImageStat
+
+from main_defs import load
+
+main = load("PREVIEW_SIZE", "THUMB_META_KEYS", "ThumbnailCache", "VIDEO_EXTS",
+            "REDUCE_MODES", "decode_reduced", "stretch_to_8bit", "make_thumbnail")
+
+def gradient(mode, size=(1200, 900)):
+    return Image.linear_gradient("L").resize(size).convert(mode)
+
+def test_16bit_png_keeps_its_tonal_range(tmp_path):
+    # 12-bit sensor data stored as 16-bit, as cameras and scanners write it
+    path = tmp_path / "grey16.png"
+    gradient("I").point(lambda v: v * 16 + 200).convert("I;16").save(path)
+    assert Image.open(path).mode == "I;16"
+
+    thumb = main.make_thumbnail(str(path), (280, 280))
+    assert thumb.mode == "L"
+    assert max(thumb.size) == 280
+    assert thumb.getextrema() == (0, 255)
+    assert 100 < ImageStat.Stat(thumb).mean[0] < 155
+
+def test_float_tiff_is_not_black(tmp_path):
+    path = tmp_path / "float.tif"
+    gradient("F").point(lambda v: v / 255.0).save(path)
+
+    thumb = main.make_thumbnail(str(path), (280, 280))
+    assert thumb.mode == "L"
+    assert thumb.getextrema() == (0, 255)
+
+def test_palette_and_bilevel_images_are_thumbnailed(tmp_path):
+    for mode in ("P", "1"):
+        path = tmp_path / f"{mode}.png"
+        Image.new(mode, (1200, 900)).save(path)
+        assert max(main.make_thumbnail(str(path), (280, 280)).size) == 280
+
+def test_concurrent_stores_of_one_key_publish_a_whole_png(tmp_path):
+    cache = main.ThumbnailCache(str(tmp_path) + "/", 10 ** 7)
+    img = gradient("RGB", (280, 210))
+    errors = []
+
+    def store():
+        try:
+            cache.store("same.png", img)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=store) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert os.listdir(tmp_path) == ["same.png"]
+    assert cache.load("same.png").size == (280, 210)
+    assert cache.total == os.path.getsize(tmp_path / "same.png")